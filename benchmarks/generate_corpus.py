@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Generate a synthetic ALTO-like XML corpus for the benchmarks.
+
+Files match the fixtures in benchmarks/fixtures (bench_alto.xsd/.sch):
+- small and large files (number of TextBlocks per page is configurable);
+- a configurable share of invalid files, half XSD-invalid (bad HPOS value)
+  and half Schematron-invalid (a String outside its page).
+
+Usage:
+    python benchmarks/generate_corpus.py out/corpus --small 500 --large 5
+"""
+
+import argparse
+import random
+import re
+from pathlib import Path
+
+ALTO_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n<alto><c:source xmlns:c="urn:bench:common">bench</c:source>\n'
+
+
+def make_alto(blocks: int, strings: int, invalid: str | None, rnd: random.Random) -> str:
+    """Build one ALTO document; `invalid` is None, "xsd" or "sch"."""
+    width, height = 5000, 7000
+    parts = [ALTO_HEADER, f'<Page ID="P1" WIDTH="{width}" HEIGHT="{height}">\n']
+    for b in range(blocks):
+        parts.append(f'<TextBlock ID="TB{b}">')
+        for s in range(strings):
+            hpos = rnd.randint(0, width)
+            vpos = rnd.randint(0, height)
+            word = "".join(rnd.choice("abcdefghij") for _ in range(rnd.randint(2, 9)))
+            parts.append(f'<String CONTENT="{word}" HPOS="{hpos}" VPOS="{vpos}" WC="0.{rnd.randint(1, 99)}"/>')
+        parts.append("</TextBlock>\n")
+    parts.append("</Page>\n</alto>\n")
+    doc = "".join(parts)
+
+    if invalid == "xsd":
+        doc = doc.replace('HPOS="', 'HPOS="x', 1)
+    elif invalid == "sch":
+        doc = re.sub(r'HPOS="\d+"', f'HPOS="{width + 1}"', doc, count=1)
+    return doc
+
+
+def generate(out_dir: Path, small: int, large: int, small_blocks: int,
+             large_blocks: int, strings: int, invalid_ratio: float,
+             seed: int = 42) -> list[Path]:
+    rnd = random.Random(seed)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    files = []
+    for kind, count, blocks in (("small", small, small_blocks),
+                                ("large", large, large_blocks)):
+        for n in range(count):
+            invalid = None
+            if rnd.random() < invalid_ratio:
+                invalid = rnd.choice(("xsd", "sch"))
+            path = out_dir / f"{kind}_{n:06d}_alto.xml"
+            path.write_text(make_alto(blocks, strings, invalid, rnd), encoding="utf-8")
+            files.append(path)
+    return files
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic XML corpus.")
+    parser.add_argument("out_dir", type=Path)
+    parser.add_argument("--small", type=int, default=200, help="Number of small files")
+    parser.add_argument("--large", type=int, default=2, help="Number of large files")
+    parser.add_argument("--small-blocks", type=int, default=20, help="TextBlocks per small file")
+    parser.add_argument("--large-blocks", type=int, default=20000, help="TextBlocks per large file")
+    parser.add_argument("--strings", type=int, default=10, help="Strings per TextBlock")
+    parser.add_argument("--invalid-ratio", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    files = generate(args.out_dir, args.small, args.large, args.small_blocks,
+                     args.large_blocks, args.strings, args.invalid_ratio, args.seed)
+    total = sum(f.stat().st_size for f in files)
+    print(f"✅ Generated {len(files)} files ({total / 1e6:.1f} MB) in {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for xml-validator.
+
+Measures, on a synthetic corpus (see generate_corpus.py):
+- XSD compile time and validate_single_xsd per file;
+- compile_schematron and validate_single_sch per file (only when Java and the
+  SchXslt2 transpiler are available);
+- the native (lxml) Schematron engine per file and in the pool;
+- pool start-up (ProcessPoolExecutor + init_worker);
+- CLI start-up (`--version`, `--list-profiles`) compared with a bare
+  interpreter; `--version` must stay within --startup-budget;
+- end-to-end throughput per engine and worker count.
+
+Reports files/sec, MB/sec, p50/p95 per-file latency and peak RSS, and writes
+everything to a JSON file so runs can be compared (--compare).
+
+Usage:
+    python benchmarks/run_benchmarks.py --small 500 --large 3 --workers 1 2 4
+    python benchmarks/run_benchmarks.py --compare benchmarks/results/old.json
+    python benchmarks/run_benchmarks.py --startup-only
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows: geen RSS-metingen
+    resource = None
+
+# Import package from the repo checkout
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from lxml import etree  # noqa: E402
+
+from generate_corpus import generate  # noqa: E402
+from xml_validator import __version__  # noqa: E402
+from xml_validator.cli import init_worker  # noqa: E402
+from xml_validator.config import SCHXSLT_TRANSPILER  # noqa: E402
+from xml_validator.scheduler import plan_chunks  # noqa: E402
+from xml_validator.schematron import compile_schematron  # noqa: E402
+from xml_validator import validate  # noqa: E402
+
+REPO = Path(__file__).resolve().parent.parent
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+XSD = FIXTURES / "bench_alto.xsd"
+SCH = FIXTURES / "bench_alto.sch"
+
+
+def peak_rss_mb(children: bool = False) -> float | None:
+    if resource is None:
+        return None
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    kb = resource.getrusage(who).ru_maxrss
+    # Linux rapporteert KB, macOS bytes.
+    return kb / 1024 / (1024 if sys.platform == "darwin" else 1)
+
+
+def percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[k]
+
+
+def summarize(name: str, engine: str, workers: int, files, seconds: float,
+              latencies, rss) -> dict:
+    total_bytes = sum(f.stat().st_size for f in files)
+    return {
+        "name": name,
+        "engine": engine,
+        "workers": workers,
+        "files": len(files),
+        "seconds": round(seconds, 4),
+        "files_per_sec": round(len(files) / seconds, 2) if seconds else None,
+        "mb_per_sec": round(total_bytes / 1e6 / seconds, 2) if seconds else None,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "peak_rss_mb": round(rss, 1) if rss is not None else None,
+    }
+
+
+def timed_chunk(chunk, checks):
+    """Worker-kant: valideer een chunk en meet de latency per bestand."""
+    latencies = []
+    for f, _, _, hits in chunk:
+        file_checks = [checks[i] for i in hits]
+        start = time.perf_counter()
+        validate.validate_file(f, file_checks)
+        latencies.append(time.perf_counter() - start)
+    return latencies, peak_rss_mb()
+
+
+def bench_xsd_compile(repeat: int) -> dict:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with open(XSD, "rb") as f:
+            etree.XMLSchema(etree.parse(f))
+        times.append(time.perf_counter() - start)
+    return {
+        "name": "xsd_compile", "engine": "XSD", "workers": 1,
+        "repeat": repeat,
+        "p50_ms": round(percentile(times, 50) * 1000, 3),
+        "p95_ms": round(percentile(times, 95) * 1000, 3),
+    }
+
+
+def bench_single(name: str, engine: str, files, func) -> dict:
+    latencies = []
+    start = time.perf_counter()
+    for f in files:
+        t = time.perf_counter()
+        func(f)
+        latencies.append(time.perf_counter() - t)
+    return summarize(name, engine, 1, files, time.perf_counter() - start,
+                     latencies, peak_rss_mb())
+
+
+def bench_startup(args, repeat: int) -> dict:
+    """Wandkloktijd van een vers proces: `python <args>` vanuit de repo."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], cwd=REPO, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return {
+        "name": "startup", "engine": " ".join(args[2:]) or "python", "workers": 1,
+        "repeat": repeat,
+        "p50_ms": round(percentile(times, 50) * 1000, 3),
+        "p95_ms": round(percentile(times, 95) * 1000, 3),
+    }
+
+
+def bench_startups(repeat: int) -> list[dict]:
+    return [bench_startup(["-c", "pass"], repeat),
+            bench_startup(["-m", "xml_validator", "--version"], repeat),
+            bench_startup(["-m", "xml_validator", "--list-profiles"], repeat)]
+
+
+# Mogen niet geladen worden door alleen `import xml_validator.cli`; die komen
+# pas in de functies die ze gebruiken (zie cli.py).
+HEAVY_MODULES = ("lxml", "tqdm", "yaml", "pyarrow", "concurrent.futures.process")
+
+
+def heavy_imports() -> list[str]:
+    code = ("import sys, xml_validator.cli; "
+            f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    out = subprocess.run([sys.executable, "-c", code], cwd=REPO, check=True,
+                         capture_output=True, text=True).stdout.strip()
+    return out.split(",") if out else []
+
+
+def check_startup_budget(results, budget_ms: float) -> bool:
+    """`--version` mag hooguit `budget_ms` langer duren dan een lege Python-start,
+    en het importeren van de CLI laadt geen van de HEAVY_MODULES."""
+    p50 = {r["engine"]: r["p50_ms"] for r in results if r["name"] == "startup"}
+    overhead = p50["--version"] - p50["python"]
+    heavy = heavy_imports()
+    ok = overhead <= budget_ms and not heavy
+    print(f"{'✅' if ok else '❌'} --version start-up: {overhead:.1f} ms above a bare "
+          f"interpreter (budget {budget_ms:.0f} ms)"
+          + (f"; eagerly imported: {', '.join(heavy)}" if heavy else ""))
+    return ok
+
+
+def bench_pool_setup(workers: int) -> dict:
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=([str(XSD)], 16, False)) as executor:
+        list(executor.map(abs, range(workers)))
+    return {
+        "name": "pool_setup", "engine": "-", "workers": workers,
+        "seconds": round(time.perf_counter() - start, 4),
+    }
+
+
+def bench_pool(engine: str, check, files, workers: int) -> dict:
+    items = [(f, f.stat().st_size, 0, (0,)) for f in files]
+    chunks = plan_chunks(items, workers, 64 * 1024 * 1024, 200)
+    checks = {0: check}
+    latencies = []
+    rss = []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=([str(XSD)], 16, True)) as executor:
+        for lat, peak in executor.map(timed_chunk, chunks, [checks] * len(chunks)):
+            latencies.extend(lat)
+            if peak is not None:
+                rss.append(peak)
+    seconds = time.perf_counter() - start
+    return summarize("pool", engine, workers, files, seconds, latencies,
+                     max(rss) if rss else None)
+
+
+def compare(current: dict, previous_path: Path):
+    previous = json.loads(previous_path.read_text(encoding="utf-8"))
+    old = {(r["name"], r["engine"], r["workers"]): r for r in previous["results"]}
+    print(f"\n📊 Compared with {previous_path}:")
+    for r in current["results"]:
+        key = (r["name"], r["engine"], r["workers"])
+        if key not in old:
+            continue
+        for metric in ("files_per_sec", "p50_ms", "p95_ms", "seconds"):
+            a, b = old[key].get(metric), r.get(metric)
+            if a and b:
+                print(f"   {key[0]:<14} {key[1]:<10} w={key[2]:<3} {metric:<14} "
+                      f"{a:>10} -> {b:>10} ({(b - a) / a * 100:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run xml-validator benchmarks.")
+    parser.add_argument("--corpus", type=Path, help="Existing corpus dir (default: generate a temp one)")
+    parser.add_argument("--small", type=int, default=200)
+    parser.add_argument("--large", type=int, default=2)
+    parser.add_argument("--large-blocks", type=int, default=5000)
+    parser.add_argument("--invalid-ratio", type=float, default=0.1)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--sch-files", type=int, default=50,
+                        help="Max files for the single-process Schematron benchmark")
+    parser.add_argument("--output", type=Path,
+                        default=Path(__file__).resolve().parent / "results")
+    parser.add_argument("--compare", type=Path, help="Previous results JSON to compare with")
+    parser.add_argument("--startup-repeat", type=int, default=20)
+    parser.add_argument("--startup-budget", type=float, default=150.0,
+                        help="Max ms that `--version` may take above a bare interpreter")
+    parser.add_argument("--startup-only", action="store_true",
+                        help="Only run the CLI start-up benchmark")
+    args = parser.parse_args()
+
+    startup = bench_startups(args.startup_repeat)
+    if args.startup_only:
+        for r in startup:
+            print("   " + "  ".join(f"{k}={v}" for k, v in r.items()))
+        sys.exit(0 if check_startup_budget(startup, args.startup_budget) else 1)
+
+    tmp = None
+    if args.corpus:
+        files = sorted(args.corpus.glob("*.xml"))
+    else:
+        tmp = tempfile.mkdtemp(prefix="xmlval-bench-")
+        files = generate(Path(tmp), args.small, args.large, 20, args.large_blocks,
+                         10, args.invalid_ratio)
+
+    results = startup + [bench_xsd_compile(repeat=20)]
+    validate.configure_xsd_cache(16)
+    results.append(bench_single(
+        "single", "XSD", files,
+        lambda f: validate.validate_single_xsd(f, XSD, XSD.name)))
+    results.extend(bench_pool_setup(w) for w in args.workers)
+    results.extend(bench_pool("XSD", ("XSD", XSD, XSD.name), files, w)
+                   for w in args.workers)
+
+    results.append(bench_single(
+        "single", "SchematronNative", files,
+        lambda f: validate.validate_single_sch_native(f, SCH, SCH.name)))
+    results.extend(bench_pool("SchematronNative", ("SchematronNative", SCH, SCH.name),
+                              files, w) for w in args.workers)
+
+    if shutil.which("java") and SCHXSLT_TRANSPILER.exists():
+        start = time.perf_counter()
+        compiled = compile_schematron(SCH)
+        results.append({"name": "sch_compile", "engine": "Schematron", "workers": 1,
+                        "seconds": round(time.perf_counter() - start, 4)})
+        try:
+            sch_files = files[:args.sch_files]
+            results.append(bench_single(
+                "single", "Schematron", sch_files,
+                lambda f: validate.validate_single_sch(f, compiled, SCH.name)))
+            results.extend(bench_pool("Schematron", ("Schematron", compiled, SCH.name),
+                                      files, w) for w in args.workers)
+        finally:
+            compiled.unlink(missing_ok=True)
+    else:
+        print("ℹ️ Java or SchXslt2 not available; Schematron benchmarks skipped")
+
+    report = {
+        "meta": {
+            "version": __version__,
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "lxml": ".".join(map(str, etree.LXML_VERSION)),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "corpus_files": len(files),
+            "corpus_bytes": sum(f.stat().st_size for f in files),
+        },
+        "results": results,
+    }
+
+    for r in results:
+        print("   " + "  ".join(f"{k}={v}" for k, v in r.items()))
+
+    args.output.mkdir(parents=True, exist_ok=True)
+    out_file = args.output / f"bench_{datetime.now():%Y-%m-%d_%H-%M-%S}.json"
+    out_file.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"\n✅ Results written to {out_file}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+    startup_ok = check_startup_budget(results, args.startup_budget)
+
+    if tmp:
+        shutil.rmtree(tmp, ignore_errors=True)
+    if not startup_ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
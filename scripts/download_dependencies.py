@@ -4,13 +4,16 @@ Download dependencies for xml-validator:
 - SchXslt2 (Schematron transpiler)
 - Saxon HE (XSLT 3.0 processor)
 - xmlresolver (required for Saxon >= 12)
+- compiles the Saxon helper (SaxonServer.java) when javac is available
 
 Run this once after cloning the repo.
 """
 
+import os
 import urllib.request
 import zipfile
 import shutil
+import subprocess
 import sys
 from pathlib import Path
 
@@ -80,6 +83,18 @@ def main():
     for j in jars:
         print(f"   - {j.name}")
 
+    # --- Saxon helper (optional: without javac it is started from source) ---
+    if shutil.which("javac"):
+        config.SAXON_SERVER_CLASSES.mkdir(parents=True, exist_ok=True)
+        subprocess.run([
+            "javac", "-cp", os.pathsep.join(str(j.resolve()) for j in jars),
+            "-d", str(config.SAXON_SERVER_CLASSES),
+            str(config.SAXON_SERVER_SOURCE),
+        ], check=True)
+        print(f"✅ Compiled Saxon helper -> {config.SAXON_SERVER_CLASSES}")
+    else:
+        print("ℹ️ javac not found; the Saxon helper is started from source (Java >= 11)")
+
     print("\n✅ Dependencies are up to date")
     print(f"Classpath: {config.CLASSPATH}")
 
@@ -0,0 +1,56 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+XSD = """<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema">
+  <xs:element name="a" type="xs:int"/>
+</xs:schema>
+"""
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Laat de worker die die.xml krijgt hard sterven, zoals bij de OOM-killer.
+KILLER = """
+import multiprocessing, os, sys
+import xml_validator.validate as validate
+from xml_validator.cli import main
+
+multiprocessing.set_start_method("fork")
+original = validate.validate_file
+
+def validate_file(xmlfile, *args, **kwargs):
+    if xmlfile.name == "die.xml":
+        os._exit(1)
+    return original(xmlfile, *args, **kwargs)
+
+validate.validate_file = validate_file
+sys.argv[0] = "xml_validator"
+main()
+"""
+
+
+def test_dead_worker_is_reported_and_run_completes(tmp_path):
+    (tmp_path / "s.xsd").write_text(XSD)
+    (tmp_path / "config.yaml").write_text("chunk_files: 1\n")
+    batch = tmp_path / "batch"
+    batch.mkdir()
+    (batch / "die.xml").write_text("<a>1</a>")
+    for n in range(8):
+        (batch / f"ok{n}.xml").write_text("<a>1</a>")
+
+    subprocess.run(
+        [sys.executable, "-c", KILLER, "-c", "config.yaml", "-s", "s.xsd",
+         "-b", "batch", "-o", "out", "--output-format", "jsonl", "-j", "2"],
+        cwd=tmp_path, env={**os.environ, "PYTHONPATH": str(ROOT)},
+        capture_output=True, check=False, timeout=120)
+
+    log, = (tmp_path / "out").glob("*.jsonl")
+    rows = {Path(r["file"]).name: r
+            for r in map(json.loads, log.read_text().splitlines())}
+    assert sorted(rows) == sorted(p.name for p in batch.iterdir())
+    assert rows["die.xml"]["status"] == "error"
+    assert "Worker process died" in rows["die.xml"]["details"]
+    # Wat na de nieuwe pool kwam, is gewoon gevalideerd.
+    assert any(r["status"] == "valid" for r in rows.values())
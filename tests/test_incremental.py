@@ -0,0 +1,62 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+XSD = """<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema">
+  <xs:element name="a" type="xs:int"/>
+</xs:schema>
+"""
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def run(tmp_path, output, *args):
+    # Logs van een vorige run in dezelfde seconde (zelfde run-id) weghalen;
+    # de index blijft staan.
+    for old in (tmp_path / output).glob("*.jsonl"):
+        old.unlink()
+    subprocess.run(
+        [sys.executable, "-m", "xml_validator", "-c", str(tmp_path / "none.yaml"),
+         "-s", "s.xsd", "-b", "batch", "-o", output, "--output-format", "jsonl",
+         "-j", "1", *args],
+        cwd=tmp_path, env={**os.environ, "PYTHONPATH": str(ROOT)}, capture_output=True,
+        check=False)
+    newest = max((tmp_path / output).glob("*.jsonl"),
+                 key=lambda p: p.stat().st_mtime_ns)
+    records = [json.loads(line) for line in newest.read_text().splitlines()]
+    return sorted(records, key=lambda r: (r["file"], r["schema"]))
+
+
+def test_incremental_jsonl_matches_full_run(tmp_path):
+    (tmp_path / "s.xsd").write_text(XSD)
+    batch = tmp_path / "batch"
+    batch.mkdir()
+    (batch / "good.xml").write_text("<a>1</a>")
+    (batch / "bad.xml").write_text("<a>x</a>")
+
+    full = run(tmp_path, "full")
+    run(tmp_path, "inc", "--incremental")
+    reused = run(tmp_path, "inc", "--incremental")
+
+    assert [r["status"] for r in full] == ["invalid", "valid"]
+    assert full[0]["errors"]
+    assert reused == full
+
+
+def test_csv_results_are_not_reused_without_errors(tmp_path):
+    (tmp_path / "s.xsd").write_text(XSD)
+    batch = tmp_path / "batch"
+    batch.mkdir()
+    (batch / "bad.xml").write_text("<a>x</a>")
+
+    subprocess.run(
+        [sys.executable, "-m", "xml_validator", "-c", str(tmp_path / "none.yaml"),
+         "-s", "s.xsd", "-b", "batch", "-o", "inc", "--incremental", "-j", "1"],
+        cwd=tmp_path, env={**os.environ, "PYTHONPATH": str(ROOT)}, capture_output=True,
+        check=False)
+    reused = run(tmp_path, "inc", "--incremental")
+
+    assert reused[0]["status"] == "invalid"
+    assert reused[0]["errors"]
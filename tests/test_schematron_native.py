@@ -0,0 +1,76 @@
+import shutil
+
+import pytest
+from lxml import etree
+
+from xml_validator.config import LIB_DIR, SCHXSLT_TRANSPILER
+from xml_validator.schematron_native import NativeSchematron, document_context
+from xml_validator.validate import (validate_single_sch,
+                                    validate_single_sch_native)
+
+SCH = """<sch:schema xmlns:sch="http://purl.oclc.org/dsdl/schematron">
+  <sch:let name="pages" value="count(alto/Layout/Page)"/>
+  <sch:pattern>
+    <sch:let name="root" value="name()"/>
+    <sch:rule context="Layout">
+      <sch:assert test="$pages = 1">Expected one page, found <sch:value-of select="$pages"/></sch:assert>
+      <sch:assert test="$root = ''">Let on the document node, got '<sch:value-of select="$root"/>'</sch:assert>
+    </sch:rule>
+  </sch:pattern>
+</sch:schema>
+"""
+
+VALID = "<alto><Layout><Page/></Layout></alto>"
+INVALID = "<alto><Layout><Page/><Page/></Layout></alto>"
+
+
+def saxon_available() -> bool:
+    return (shutil.which("java") is not None and SCHXSLT_TRANSPILER.exists()
+            and any(LIB_DIR.glob("Saxon-HE*.jar")))
+
+
+@pytest.fixture
+def files(tmp_path):
+    sch = tmp_path / "alto.sch"
+    sch.write_text(SCH)
+    valid = tmp_path / "valid.xml"
+    valid.write_text(VALID)
+    invalid = tmp_path / "invalid.xml"
+    invalid.write_text(INVALID)
+    return sch, valid, invalid
+
+
+@pytest.mark.parametrize("expr, expected", [
+    ("count(alto/Page)", "count(/alto/Page)"),
+    ("$pages = 1", "$pages = 1"),
+    ("name()", "name(/)"),
+    ("alto/Page[Block/@id = 'x']", "/alto/Page[Block/@id = 'x']"),
+    ("count(a) div count(//b)", "count(/a) div count(//b)"),
+    ("concat('a/b', x)", "concat('a/b', /x)"),
+])
+def test_document_context(expr, expected):
+    assert document_context(expr) == expected
+
+
+def test_relative_let_is_evaluated_from_the_document(files):
+    sch, valid, invalid = files
+    row = validate_single_sch_native(valid, sch, sch.name)
+    assert row["status"] == "valid", row["details"]
+
+    failed, details, total = NativeSchematron(sch).validate(
+        etree.parse(str(invalid)))
+    assert (failed, total) == (1, 1)
+    assert details[0].endswith("Expected one page, found 2")
+
+
+@pytest.mark.skipif(not saxon_available(), reason="Java/Saxon not available")
+def test_relative_let_matches_saxon(files, tmp_path):
+    from xml_validator.schematron import compile_schematron
+
+    sch, valid, invalid = files
+    compiled = compile_schematron(sch, cache_dir=tmp_path / "cache")
+    for xml in (valid, invalid):
+        native = validate_single_sch_native(xml, sch, sch.name)
+        saxon = validate_single_sch(xml, compiled, sch.name)
+        assert (native["status"], native["details"]) == (
+            saxon["status"], saxon["details"])
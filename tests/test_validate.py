@@ -0,0 +1,45 @@
+import pytest
+
+from xml_validator.validate import (configure_error_limits,
+                                    configure_stream_threshold,
+                                    validate_single_xsd)
+
+XSD = """<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema">
+  <xs:element name="a" type="xs:string"/>
+</xs:schema>
+"""
+
+
+@pytest.fixture
+def xsd(tmp_path):
+    path = tmp_path / "s.xsd"
+    path.write_text(XSD)
+    yield path
+    configure_error_limits()
+    configure_stream_threshold(None)
+
+
+@pytest.mark.parametrize("fail_fast", [False, True])
+def test_malformed_file_in_stream_mode_reports_syntax_error(tmp_path, xsd,
+                                                            fail_fast):
+    configure_error_limits(fail_fast=fail_fast)
+    xml = tmp_path / "broken.xml"
+    xml.write_text("<a>\n<broken>\n</a>\n")
+
+    streamed = validate_single_xsd(xml, xsd, xsd.name, stream=True)
+    tree = validate_single_xsd(xml, xsd, xsd.name)
+
+    assert streamed["status"] == "error"
+    assert "Opening and ending tag mismatch" in streamed["details"]
+    assert "line 3" in streamed["details"]
+    assert streamed["details"] == tree["details"]
+
+
+def test_schema_violation_in_stream_mode_stays_invalid(tmp_path, xsd):
+    xml = tmp_path / "invalid.xml"
+    xml.write_text("<a>\n<b/>\n</a>\n")
+
+    row = validate_single_xsd(xml, xsd, xsd.name, stream=True)
+
+    assert row["status"] == "invalid"
+    assert "Element content is not allowed" in row["details"]
@@ -0,0 +1,202 @@
+import hashlib
+import urllib.request
+from pathlib import Path
+from urllib.parse import urljoin, urlparse
+
+from lxml import etree
+
+from .config import XSD_NS
+
+# Catalogus die --bundle-schemas in de bundelmap schrijft.
+BUNDLE_CATALOG = "catalog.xml"
+
+OASIS_NS = "urn:oasis:names:tc:entity:xmlns:xml:catalog"
+_XML_BASE = "{http://www.w3.org/XML/1998/namespace}base"
+
+_LOCATIONS = etree.XPath(
+    "/xs:schema/xs:include/@schemaLocation"
+    " | /xs:schema/xs:import/@schemaLocation"
+    " | /xs:schema/xs:redefine/@schemaLocation"
+    " | /xs:schema/xs:override/@schemaLocation",
+    namespaces=XSD_NS)
+
+
+def schema_locations(tree) -> list[str]:
+    """Alle `schemaLocation`s van includes/imports/redefines in een XSD."""
+    return [str(loc) for loc in _LOCATIONS(tree)]
+
+
+def is_remote(location: str) -> bool:
+    return urlparse(location).scheme in ("http", "https")
+
+
+class SchemaCatalog:
+    """Vertaling van schema-URL's naar lokale bestanden.
+
+    `uris` koppelt een volledige URL (of systemId/publicId) aan een bestand,
+    `rewrites` een URL-prefix aan een lokale map. Picklebaar, zodat het
+    hoofdproces de catalogus één keer inleest en aan de workers meegeeft.
+    """
+
+    def __init__(self):
+        self.uris: dict[str, Path] = {}
+        self.rewrites: list[tuple[str, Path]] = []
+
+    def __bool__(self):
+        return bool(self.uris or self.rewrites)
+
+    def add(self, name: str, target: Path):
+        """Voeg een mapping toe; een naam die op `/` eindigt is een prefix."""
+        if name.endswith("/"):
+            self.rewrites.append((name, Path(target)))
+            # Langste prefix eerst, zoals bij OASIS rewriteURI.
+            self.rewrites.sort(key=lambda r: len(r[0]), reverse=True)
+        else:
+            self.uris.setdefault(name, Path(target))
+
+    def lookup(self, url: str) -> Path | None:
+        """Lokaal bestand voor `url`, of None als de catalogus het niet kent."""
+        path = self.uris.get(url)
+        if path is None:
+            for prefix, target in self.rewrites:
+                if url.startswith(prefix):
+                    path = target / url[len(prefix):]
+                    break
+        return path if path is not None and path.is_file() else None
+
+    def read_oasis(self, catalog_file: Path):
+        """Lees een OASIS XML-catalogus (uri, system, public, rewriteURI,
+        rewriteSystem en nextCatalog); relatieve paden gelden t.o.v. de
+        catalogus of een `xml:base`."""
+        pending = [Path(catalog_file).resolve()]
+        seen = set()
+        while pending:
+            path = pending.pop(0)
+            if path in seen:
+                continue
+            seen.add(path)
+            root = etree.parse(str(path)).getroot()
+            for el in root.iter(f"{{{OASIS_NS}}}*"):
+                base = path.parent
+                for parent in [el] + list(el.iterancestors()):
+                    if parent.get(_XML_BASE):
+                        base = base / parent.get(_XML_BASE)
+                        break
+                kind = etree.QName(el).localname
+                if kind == "uri":
+                    self.add(el.get("name"), base / el.get("uri"))
+                elif kind == "system":
+                    self.add(el.get("systemId"), base / el.get("uri"))
+                elif kind == "public":
+                    self.add(el.get("publicId"), base / el.get("uri"))
+                elif kind in ("rewriteURI", "rewriteSystem"):
+                    start = el.get("uriStartString") or el.get("systemIdStartString")
+                    prefix = start if start.endswith("/") else start + "/"
+                    self.add(prefix, base / el.get("rewritePrefix"))
+                elif kind == "nextCatalog":
+                    pending.append((base / el.get("catalog")).resolve())
+
+
+def load_catalog(catalog_files=(), mapping=None, base_dir: Path = Path(".")):
+    """Bouw een SchemaCatalog uit OASIS-catalogi en een mapping uit config.yaml.
+
+    Relatieve paden in `mapping` gelden t.o.v. `base_dir` (de config-map).
+    Entries uit `mapping` gaan voor die uit de catalogi. Geeft None als er
+    niets te vertalen valt.
+    """
+    catalog = SchemaCatalog()
+    for name, target in (mapping or {}).items():
+        catalog.add(str(name), Path(base_dir) / target)
+    for catalog_file in catalog_files:
+        catalog.read_oasis(Path(catalog_file))
+    return catalog or None
+
+
+class CatalogResolver(etree.Resolver):
+    """lxml-resolver die remote schema's uit de catalogus van schijf leest.
+
+    Het bestand wordt geladen met de oorspronkelijke URL als base, zodat
+    relatieve imports daarin weer via de catalogus lopen.
+    """
+
+    def __init__(self, catalog: SchemaCatalog):
+        super().__init__()
+        self.catalog = catalog
+
+    def resolve(self, url, pubid, context):
+        path = self.catalog.lookup(url) if url else None
+        if path is None and pubid:
+            path = self.catalog.lookup(pubid)
+        if path is None:
+            return None
+        return self.resolve_string(path.read_bytes(), context, base_url=url)
+
+
+def _fetch(url: str) -> bytes:
+    with urllib.request.urlopen(url, timeout=60) as response:
+        return response.read()
+
+
+def bundle_schemas(schema_paths, bundle_dir: Path,
+                   catalog: SchemaCatalog | None = None, fetch=_fetch):
+    """Download alle (transitieve) remote imports van de XSD's naar een bundel.
+
+    Elk remote schema wordt één keer opgehaald en opgeslagen als
+    `<sha256-prefix>-<naam>` in `bundle_dir`; de OASIS-catalogus
+    `bundle_dir/catalog.xml` koppelt de URL's aan die bestanden. Wat al in de
+    bundel of in `catalog` staat wordt niet opnieuw gedownload. Geeft
+    `(catalog_path, downloaded, failed)`: de nieuw opgehaalde URL's en een
+    lijst `(url, fout)`.
+    """
+    bundle_dir = Path(bundle_dir)
+    bundle_dir.mkdir(parents=True, exist_ok=True)
+    catalog_path = bundle_dir / BUNDLE_CATALOG
+
+    bundled = SchemaCatalog()
+    if catalog_path.exists():
+        bundled.read_oasis(catalog_path)
+    entries = {url: path for url, path in bundled.uris.items()
+               if path.is_file()}
+
+    downloaded, failed = [], []
+    seen = set()
+    todo = [(Path(p).resolve(), None) for p in schema_paths]
+    while todo:
+        path, url = todo.pop()
+        if (path, url) in seen or not path.is_file():
+            continue
+        seen.add((path, url))
+        try:
+            tree = etree.parse(str(path))
+        except etree.XMLSyntaxError:
+            continue
+        for loc in schema_locations(tree):
+            if url is not None:
+                loc = urljoin(url, loc)
+            if not is_remote(loc):
+                todo.append(((path.parent / loc).resolve(), None))
+                continue
+            local = entries.get(loc) or (catalog.lookup(loc) if catalog else None)
+            if local is None:
+                try:
+                    data = fetch(loc)
+                except Exception as e:
+                    failed.append((loc, str(e)))
+                    continue
+                digest = hashlib.sha256(data).hexdigest()[:16]
+                name = Path(urlparse(loc).path).name or "schema.xsd"
+                local = bundle_dir / f"{digest}-{name}"
+                if not local.exists():
+                    local.write_bytes(data)
+                entries[loc] = local
+                downloaded.append(loc)
+            todo.append((local.resolve(), loc))
+
+    root = etree.Element(f"{{{OASIS_NS}}}catalog", nsmap={None: OASIS_NS})
+    for loc in sorted(entries):
+        if entries[loc].parent.resolve() == bundle_dir.resolve():
+            etree.SubElement(root, f"{{{OASIS_NS}}}uri",
+                             name=loc, uri=entries[loc].name)
+    etree.ElementTree(root).write(str(catalog_path), encoding="UTF-8",
+                                  xml_declaration=True, pretty_print=True)
+    return catalog_path, downloaded, failed
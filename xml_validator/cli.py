@@ -1,23 +1,47 @@
 # src/xml_validator/cli.py
 import argparse
+import json
 import logging
 import os
-import re
 import shutil
+import signal
 import sys
+import time
 from collections import Counter
-from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
+from itertools import chain
 from pathlib import Path
 
-import yaml
-from tqdm import tqdm
-from xml_validator.schematron import compile_schematron
-from xml_validator.utils import load_config, setup_logging, write_csv_log
-from xml_validator.validate import validate_single_sch, validate_single_xsd
+from xml_validator.dedup import Deduplicator
+from xml_validator.journal import (OUTPUT_KEYS, RESUME_KEYS, CompletedWork,
+                                   RunJournal, journal_path, load_journal)
+from xml_validator.discovery import Discovery
+from xml_validator.prefetch import Prefetcher
+from xml_validator.records import (STATUSES, error_records, pack_rows,
+                                   unpack_records)
+from xml_validator.scheduler import (FailureCounter, MemoryBudget,
+                                     mark_rss_baseline, peak_rss, plan_chunks,
+                                     rss_growth, windows)
+from xml_validator.config import (CHUNK_BYTES, CHUNK_FILES, DISCOVERY_WINDOW,
+                                  MAX_ERRORS_PER_FILE, PREFETCH_BYTES, SAXON_BATCH_SIZE,
+                                  SCHEMATRON_ENGINE, STREAM_THRESHOLD,
+                                  WATCH_DEBOUNCE, WATCH_INTERVAL, WATCH_LOG_PATTERN,
+                                  XSD_CACHE_SIZE, classpath, set_classpath)
+from xml_validator.timings import TimingSummary
+from xml_validator.utils import load_config, parse_size, setup_logging
+from xml_validator.writers import (EXTENSIONS, OUTPUT_FORMATS, RollingLogWriter,
+                                   open_log_writers, parse_formats)
 
 from . import __version__
 
+# Zware modules (lxml en alles wat daarop bouwt, tqdm, ProcessPoolExecutor)
+# worden pas geïmporteerd in de functies die ze gebruiken. Zo zijn --version,
+# --list-profiles en --print-config snel, en laadt een gespawnde worker alleen
+# wat init_worker en process_chunk nodig hebben.
+
+# Gedeelde fail-fast-teller van de run (in een worker gezet door init_worker).
+_failures = None
+
 
 def parse_args():
     parser = argparse.ArgumentParser(
@@ -45,6 +69,10 @@ def parse_args():
         help="Output directory for CSV log.",
         default="output"
     )
+    parser.add_argument(
+        "--output-format",
+        help=f"Output format(s), comma-separated: {', '.join(OUTPUT_FORMATS)} "
+             "(default: csv).")
     parser.add_argument(
         "-v", "--verbose",
         action="store_true",
@@ -58,6 +86,56 @@ def parse_args():
         action="store_true",
         help="Search for XML files recursively in batch directories."
     )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Skip files whose result is still valid in the result index.")
+    parser.add_argument(
+        "--resume",
+        metavar="RUN_ID",
+        help="Continue an interrupted run from its journal in the output directory.")
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running: validate new or modified files in the batch "
+             "directories as they arrive (stop with Ctrl-C).")
+    parser.add_argument(
+        "--dedup",
+        action="store_true",
+        help="Validate byte-identical files once per schema and copy the result.")
+    parser.add_argument(
+        "--tiered",
+        action="store_true",
+        help="Gate validations per file: well-formedness, then XSD, then "
+             "Schematron (later tiers are skipped as upstream-invalid).")
+    parser.add_argument(
+        "--schematron-engine",
+        choices=["auto", "native", "saxon"],
+        help="Schematron engine: native lxml (XPath 1.0 only), Saxon, or auto (default).")
+    parser.add_argument(
+        "--max-errors-per-file",
+        type=int,
+        help=f"Maximum number of messages per file and schema in the details "
+             f"(default: {MAX_ERRORS_PER_FILE}; 0 = unlimited).")
+    parser.add_argument(
+        "--fail-fast",
+        nargs="?",
+        type=int,
+        const=1,
+        metavar="N",
+        help="Stop each file at its first error and stop the run after N "
+             "failing files (default N: 1).")
+    parser.add_argument(
+        "--bundle-schemas",
+        nargs="?",
+        const="",
+        metavar="DIR",
+        help="Download all remote XSD imports into a local schema bundle "
+             "(default: schema_bundle from config.yaml) and exit.")
+    parser.add_argument(
+        "--timings",
+        action="store_true",
+        help="Record per-file phase timings (extra CSV columns + summary).")
     parser.add_argument(
         "--profile",
         help="Use a predefined profile from config.yaml"
@@ -107,7 +185,8 @@ def merge_config_and_args(args) -> dict:
                         schemas = v.get("schemas", [])
                         if not schemas and "schema" in v:
                             schemas = [v["schema"]]
-                        print(f"    - pattern={v.get('pattern')}  schemas={schemas}")
+                        tiers = f"  tiers={v['tiers']}" if v.get("tiers") else ""
+                        print(f"    - pattern={v.get('pattern')}  schemas={schemas}{tiers}")
                 else:
                     print(f"  {name}: pattern={prof.get('pattern')} schema={prof.get('schema')}")
         sys.exit(0)
@@ -132,6 +211,15 @@ def merge_config_and_args(args) -> dict:
                         "pattern": pattern,
                         "schema": resolve_schema_path(schema, config_dir),
                     })
+                # Getierde schema's: een latere tier draait alleen als de
+                # eerdere tiers van het bestand slaagden.
+                for tier, names in enumerate(v.get("tiers", []), 1):
+                    for schema in [names] if isinstance(names, str) else names:
+                        validations.append({
+                            "pattern": pattern,
+                            "schema": resolve_schema_path(schema, config_dir),
+                            "tier": tier,
+                        })
         else:
             validations = [{
                 "pattern": selected.get("pattern"),
@@ -162,117 +250,734 @@ def merge_config_and_args(args) -> dict:
             for schema in schemas
         ]
 
+    # --tiered: alle validaties zonder eigen tier op type ordenen.
+    if args.tiered or config.get("tiered", False):
+        for val in validations:
+            if val.get("tier") is None:
+                val["tier"] = 1 if Path(val["schema"]).suffix.lower() == ".xsd" else 2
+
+    try:
+        sizes = {key: parse_size(config.get(key, default)) for key, default in (
+            ("stream_threshold", STREAM_THRESHOLD),
+            ("chunk_bytes", CHUNK_BYTES),
+            ("max_memory", None),
+            ("prefetch_bytes", PREFETCH_BYTES))}
+    except ValueError as e:
+        print(f"config.yaml: {e}")
+        sys.exit(2)
+
+    try:
+        output_format = parse_formats(
+            args.output_format or config.get("output_format", "csv"))
+    except ValueError as e:
+        print(f"Output format: {e}")
+        sys.exit(2)
+
     return {
         "validations": validations,
         "batches": args.batches or config.get("batches", []),
         "output": Path(args.output or config.get("output", "output")),
+        "output_format": output_format,
         "verbose": args.verbose or config.get("verbose", False),
         "jobs": args.jobs if args.jobs is not None else config.get("jobs"),
         "recursive": args.recursive or config.get("recursive", False),
+        "incremental": args.incremental or config.get("incremental", False),
+        "timings": args.timings or config.get("timings", False),
+        "dedup": args.dedup or config.get("dedup", False),
+        "max_errors_per_file": (args.max_errors_per_file
+                                if args.max_errors_per_file is not None
+                                else config.get("max_errors_per_file",
+                                                MAX_ERRORS_PER_FILE)) or None,
+        # `fail_fast: true` in de config betekent: stoppen na 1 bestand.
+        "fail_fast": int(args.fail_fast if args.fail_fast is not None
+                         else config.get("fail_fast") or 0) or None,
         "log_size": config.get("log_size", 5 * 1024 * 1024),
         "log_backups": config.get("log_backups", 5),
         "log_path": config.get("log_path", "./logs"),
+        "xsd_cache_size": config.get("xsd_cache_size", XSD_CACHE_SIZE),
+        "saxon_server": config.get("saxon_server", True),
+        "saxon_batch_size": config.get("saxon_batch_size", SAXON_BATCH_SIZE),
+        "schematron_cache": config.get("schematron_cache"),
+        "schematron_engine": args.schematron_engine or config.get(
+            "schematron_engine", SCHEMATRON_ENGINE),
+        "stream_threshold": sizes["stream_threshold"],
+        "max_memory": sizes["max_memory"],
+        "prefetch_bytes": sizes["prefetch_bytes"],
+        "chunk_bytes": sizes["chunk_bytes"],
+        "chunk_files": config.get("chunk_files", CHUNK_FILES),
+        "discovery_window": config.get("discovery_window", DISCOVERY_WINDOW),
+        "watch": args.watch or config.get("watch", False),
+        "watch_interval": float(config.get("watch_interval", WATCH_INTERVAL)),
+        "watch_debounce": float(config.get("watch_debounce", WATCH_DEBOUNCE)),
+        "watch_inotify": config.get("watch_inotify", True),
+        "watch_log_pattern": config.get("watch_log_pattern", WATCH_LOG_PATTERN),
+        "schema_bundle": resolve_schema_path(config.get("schema_bundle"), config_dir),
+        "xml_catalogs": [resolve_schema_path(c, config_dir)
+                         for c in config.get("xml_catalogs") or []],
+        "schema_catalog": {url: resolve_schema_path(path, config_dir)
+                           for url, path in (config.get("schema_catalog") or {}).items()},
     }
 
 
+def json_roundtrip(value):
+    """Waarde zoals die na opslaan in het journaal (JSON) terugkomt."""
+    return json.loads(json.dumps(value, default=str))
+
+
 def determine_workers(
-        num_batches: int,
+        num_tasks: int,
         requested: int | None) -> tuple[int, str]:
+    """Aantal workers o.b.v. het aantal werkeenheden (bestanden).
+
+    Werk wordt op bestandsniveau verdeeld, dus ook één grote batch benut alle
+    cores; alleen bij heel weinig bestanden starten we minder workers.
+    """
     if requested:
         return max(1, requested), f"user-specified ({requested})"
 
     cores = os.cpu_count() or 2
-    if num_batches <= 2:
-        return max(2, cores), f"auto: small batch count → all {cores} cores"
-    if num_batches <= cores:
-        return max(2, min(num_batches, cores - 1)), f"auto: ≤ cores → {min(num_batches, cores - 1)} workers"
-    return min(8, cores), f"auto: many batches → capped at {min(8, cores)} workers"
+    if num_tasks <= 2:
+        return max(1, num_tasks), f"auto: {num_tasks} file(s) → {max(1, num_tasks)} workers"
+    if num_tasks <= cores:
+        return max(2, min(num_tasks, cores - 1)), f"auto: ≤ cores → {min(num_tasks, cores - 1)} workers"
+    return min(8, cores), f"auto: many files → capped at {min(8, cores)} workers"
+
 
+def build_catalog(cfg: dict):
+    """Lees de schema-catalogus (mapping, OASIS-catalogi en bundel) in; None als er geen is."""
+    from xml_validator.catalog import BUNDLE_CATALOG, load_catalog
 
-def process_batch(batch_path: Path, schema_path: Path, file_pattern: str,
-                  verbose: bool, recursive: bool):
-    regex = re.compile(file_pattern or r".*\.xml$")
-    files = batch_path.rglob("*") if recursive else batch_path.glob("*")
-    xml_files = [f for f in files if regex.search(f.name)]
+    catalogs = list(cfg["xml_catalogs"])
+    if cfg["schema_bundle"]:
+        bundle_catalog = Path(cfg["schema_bundle"]) / BUNDLE_CATALOG
+        if bundle_catalog.exists():
+            catalogs.append(bundle_catalog)
+    return load_catalog(catalogs, cfg["schema_catalog"])
 
+
+def init_worker(xsd_schemas, xsd_cache_size: int, saxon_server: bool = True,
+                stream_threshold: int | None = STREAM_THRESHOLD,
+                saxon_batch_size: int = SAXON_BATCH_SIZE,
+                structured_errors: bool = False,
+                max_errors_per_file: int | None = MAX_ERRORS_PER_FILE,
+                fail_fast: bool = False, catalog=None,
+                classpath: str | None = None, ignore_sigint: bool = False,
+                failures: FailureCounter | None = None):
+    """Initializer per worker: XSD-cache vullen, Saxon-modus en stream-drempel instellen.
+
+    De Saxon-helper zelf start pas bij de eerste Schematron-validatie, zodat
+    XSD-only runs geen JVM opstarten. Met `structured_errors` krijgen regels
+    ook hun gestructureerde meldingen mee (JSON Lines/Parquet-output).
+    `max_errors_per_file` en `fail_fast` begrenzen de meldingen per bestand
+    (zie validate.configure_error_limits). Met `catalog` komen remote
+    XSD-imports van schijf. `classpath` is het in het hoofdproces bepaalde
+    Java-classpath (alleen bij Saxon-validaties), zodat workers lib/ niet
+    zelf hoeven te scannen. Met `ignore_sigint` (--watch) negeert de worker
+    Ctrl-C; het hoofdproces stopt de pool dan zelf netjes. `failures` is de
+    gedeelde fail-fast-teller van de run (zie process_chunk).
+    """
+    global _failures
+    from xml_validator.saxon import configure_saxon_batch, configure_saxon_server
+    from xml_validator.validate import (configure_catalog, configure_error_limits,
+                                        configure_stream_threshold,
+                                        configure_structured_errors,
+                                        configure_xsd_cache, warm_xsd_cache)
+
+    if ignore_sigint:
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _failures = failures
+    if classpath is not None:
+        set_classpath(classpath)
+    configure_catalog(catalog)
+    configure_structured_errors(structured_errors)
+    configure_error_limits(max_errors_per_file, fail_fast)
+    configure_xsd_cache(xsd_cache_size)
+    warm_xsd_cache(xsd_schemas)
+    configure_saxon_server(saxon_server)
+    configure_saxon_batch(saxon_batch_size)
+    configure_stream_threshold(stream_threshold)
+    mark_rss_baseline()
+
+
+def uses_saxon(schema_path: Path,
+               schematron_engine: str = SCHEMATRON_ENGINE) -> bool:
+    """Gaat dit schema naar Saxon (Java)? Zelfde keuze als prepare_check."""
+    from xml_validator.schematron_native import NativeSchematron
+
+    suffix = schema_path.suffix.lower()
+    if suffix in {".xsl", ".xslt"}:
+        return True
+    if suffix != ".sch" or schematron_engine == "native":
+        return False
+    if schematron_engine == "saxon":
+        return True
+    try:
+        NativeSchematron(schema_path)
+    except Exception:
+        return True
+    return False
+
+
+def prepare_check(schema_path: Path, verbose: bool,
+                  schematron_cache: Path | None = None,
+                  schematron_engine: str = SCHEMATRON_ENGINE):
+    """Bepaal hoe één schema in een batch gevalideerd wordt.
+
+    Geeft `(check, rows)` terug: `check` is `(validation_type, pad, naam)` voor
+    validate_file, of None als het schema niet bruikbaar is; `rows` bevat dan
+    één skipped/error-regel met de reden.
+
+    Een .sch gaat naar de native engine als `schematron_engine` "native" is,
+    of bij "auto" als de Schematron alleen XPath 1.0 gebruikt; anders naar
+    SchXslt2 + Saxon.
+    """
+    from xml_validator.schematron import compile_schematron
+    from xml_validator.schematron_native import NativeSchematron
+
+    logger = logging.getLogger("xml_validator")
     schema_name = schema_path.name
-    rows = []
-
-    if not xml_files:
-        msg = f"No matching files in {batch_path} for pattern '{file_pattern}'"
-        rows.append({
-            "file": "",
-            "schema": schema_name,
-            "validation_type": "N/A",
-            "status": "skipped",
-            "details": msg
-        })
-        logger = logging.getLogger("xml_validator")
-        logger.warning(msg)
-    else:
-        logger = logging.getLogger("xml_validator")
-        suffix = schema_path.suffix.lower()
-
-        if suffix == ".xsd":
-            rows = [validate_single_xsd(
-                f, schema_path, schema_name, verbose) for f in xml_files]
-
-        elif suffix in {".sch", ".xsl", ".xslt"}:
-            # Schematron heeft Java + Saxon nodig. Ontbreekt Java, dan slaan we
-            # deze validatie netjes over met één duidelijke melding i.p.v. een
-            # kale error per bestand of een harde crash.
-            if shutil.which("java") is None:
-                msg = (f"Java niet gevonden op PATH — Schematron-validatie "
-                       f"overgeslagen voor schema '{schema_name}'. Installeer "
-                       f"Java en zet 'java' op het PATH.")
-                rows.append({
+    suffix = schema_path.suffix.lower()
+
+    if suffix == ".xsd":
+        return ("XSD", schema_path, schema_name), []
+
+    if suffix == ".sch" and schematron_engine != "saxon":
+        try:
+            NativeSchematron(schema_path)
+            logger.info(f"Schematron '{schema_name}': native engine (lxml).")
+            return ("SchematronNative", schema_path, schema_name), []
+        except Exception as e:
+            if schematron_engine == "native":
+                msg = (f"Schematron '{schema_name}' kan niet met de native "
+                       f"engine: {e}")
+                logger.error(msg)
+                return None, [{
                     "file": "",
                     "schema": schema_name,
                     "validation_type": "Schematron",
-                    "status": "skipped",
+                    "status": "error",
                     "details": msg
-                })
-                logger.error(msg)
-            else:
-                try:
-                    if suffix == ".sch":
-                        compiled = compile_schematron(
-                            schema_path, verbose=verbose)
-                        rows = [validate_single_sch(
-                            f, compiled, schema_name, verbose) for f in xml_files]
-                        compiled.unlink(missing_ok=True)
-                    else:  # reeds gecompileerde .xsl/.xslt
-                        rows = [validate_single_sch(
-                            f, schema_path, schema_name, verbose) for f in xml_files]
-                except Exception as e:
-                    # bv. Saxon-jar ontbreekt in xml_validator/lib of een
-                    # transpile-fout: niet de hele run laten klappen.
-                    msg = (f"Schematron-tooling faalde voor schema "
-                           f"'{schema_name}': {e}. Controleer Java en de Saxon-"
-                           f"jar in xml_validator/lib.")
-                    rows.append({
-                        "file": "",
-                        "schema": schema_name,
-                        "validation_type": "Schematron",
-                        "status": "error",
-                        "details": msg
-                    })
-                    logger.error(msg)
+                }]
+            logger.info(f"Schematron '{schema_name}': Saxon ({e}).")
 
-        else:
-            msg = f"Unsupported schema type: {schema_path.suffix}"
-            rows.append({
+    if suffix in {".sch", ".xsl", ".xslt"}:
+        # Schematron heeft Java + Saxon nodig. Ontbreekt Java, dan slaan we
+        # deze validatie netjes over met één duidelijke melding i.p.v. een
+        # kale error per bestand of een harde crash.
+        if shutil.which("java") is None:
+            msg = (f"Java niet gevonden op PATH — Schematron-validatie "
+                   f"overgeslagen voor schema '{schema_name}'. Installeer "
+                   f"Java en zet 'java' op het PATH.")
+            logger.error(msg)
+            return None, [{
                 "file": "",
                 "schema": schema_name,
-                "validation_type": "N/A",
-                "status": "error",
+                "validation_type": "Schematron",
+                "status": "skipped",
                 "details": msg
-            })
+            }]
+        try:
+            if suffix == ".sch":
+                compiled = compile_schematron(
+                    schema_path, verbose=verbose, cache_dir=schematron_cache)
+            else:  # reeds gecompileerde .xsl/.xslt
+                compiled = schema_path
+            return ("Schematron", compiled, schema_name), []
+        except Exception as e:
+            # bv. Saxon-jar ontbreekt in xml_validator/lib of een
+            # transpile-fout: niet de hele run laten klappen.
+            msg = (f"Schematron-tooling faalde voor schema "
+                   f"'{schema_name}': {e}. Controleer Java en de Saxon-"
+                   f"jar in xml_validator/lib.")
             logger.error(msg)
+            return None, [{
+                "file": "",
+                "schema": schema_name,
+                "validation_type": "Schematron",
+                "status": "error",
+                "details": msg
+            }]
+
+    msg = f"Unsupported schema type: {schema_path.suffix}"
+    logger.error(msg)
+    return None, [{
+        "file": "",
+        "schema": schema_name,
+        "validation_type": "N/A",
+        "status": "error",
+        "details": msg
+    }]
+
+
+def process_chunk(chunk, checks, verbose: bool, timings: bool = False,
+                  prefetch_bytes: int = 0, tiers=None):
+    """Valideer één chunk bestanden (werkeenheid van de scheduler).
+
+    `chunk` is een lijst `(pad, grootte, mtime_ns, validatie-indices)` (zie
+    scheduler.plan_chunks), `checks` de door main() voorbereide validaties per
+    index (zie prepare_check). Elk bestand wordt één keer ingelezen en alle
+    passende validaties draaien op dezelfde boom (zie validate_file). Met
+    `timings` krijgt elke regel de fasetijden mee (--timings). Met
+    `prefetch_bytes` leest een thread de volgende bestanden al in terwijl het
+    huidige gevalideerd wordt (zie prefetch.Prefetcher); de wachttijd op die
+    thread telt dan als "read".
+
+    Met --fail-fast telt elk falend bestand mee in de gedeelde teller van de
+    run; is de drempel gehaald (ook door een andere worker), dan slaat de
+    chunk de rest van zijn bestanden over. Die krijgen geen regels, net als
+    de chunks die het hoofdproces annuleert.
+
+    `tiers` geeft per validatie-index een tier (zie validate_file). Gaat Saxon
+    in batches (zonder helper), dan draaien eerst de goedkope tiers (XSD,
+    native Schematron) voor de hele chunk en gaan daarna alleen de bestanden
+    die niet zijn tegengehouden naar Java.
+
+    Geeft `(records, cache_stats, growth)` terug. `records` zijn compacte
+    records.Record's (positie in de chunk, validatie-index, statuscode, ...)
+    i.p.v. dicts met paden en schemanamen, zodat er per regel weinig te
+    picklen valt; main() bouwt de regels weer op met unpack_records.
+    `cache_stats` bevat de XSD-cache hits en misses van deze taak, zodat main()
+    ze kan optellen, en `growth` het gemeten piekgeheugen als deze chunk de
+    piek van de worker verhoogde (voor het geheugenbudget, zie
+    scheduler.MemoryBudget).
+    """
+    from xml_validator.validate import (blocking, prefetch_svrl, saxon_batching,
+                                        streams, validate_file, xsd_cache_stats)
+
+    stats_before = Counter(xsd_cache_stats)
+    rss_before = peak_rss()
+    tiers = tiers or {}
+    jobs = [(pos, f, [i for i in hits if checks.get(i)])
+            for pos, (f, _, _, hits) in enumerate(chunk)]
+    records = []
+    failed = set()  # posities die al in de fail-fast-teller zitten
+    if _failures is not None and _failures.reached:
+        return records, Counter(), None
+
+    def run(jobs, svrl, upstream=None, prefetch=True):
+        # Valideer `(positie, pad, indices)`, eventueel met vooruit inlezen.
+        items = [(f, chunk[pos][1], pos, idx) for pos, f, idx in jobs if idx]
+        if prefetch and prefetch_bytes:
+            feed = Prefetcher(items, prefetch_bytes,
+                              skip=lambda item: streams(item[1]))
+        else:
+            feed = ((item, None, 0.0) for item in items)
+        for (f, _, pos, idx), data, wait in feed:
+            if _failures is not None and _failures.reached:
+                break
+            file_rows = validate_file(
+                f, [checks[i] for i in idx], verbose, timings, svrl, data,
+                tiers=[tiers.get(i) for i in idx],
+                upstream=upstream.get(pos) if upstream else None)
+            if timings and file_rows and wait:
+                first = file_rows[0][1]["timings"]
+                first["read"] = first.get("read", 0.0) + wait
+            records.extend(pack_rows(pos, idx, file_rows))
+            if (_failures is not None and pos not in failed and any(
+                    row["status"] in ("invalid", "error") for _, row in file_rows)):
+                failed.add(pos)
+                _failures.add()
+
+    def saxon(i):
+        return checks[i][0] == "Schematron"
+
+    if (tiers and any(saxon(i) and tiers.get(i) is not None
+                      for _, _, idx in jobs for i in idx)
+            and saxon_batching()):
+        run([(pos, f, [i for i in idx if not saxon(i)]) for pos, f, idx in jobs], {})
+        upstream = {}
+        for record in records:
+            if STATUSES[record.status] in ("invalid", "error"):
+                upstream.setdefault(record.pos, []).append(
+                    (tiers.get(record.check), checks[record.check][2]))
+        later = [(pos, f, [i for i in idx if saxon(i)]) for pos, f, idx in jobs]
+        # Zonder Saxon-helper: Schematron voor de hele chunk in een paar
+        # Java-runs, alleen voor wat niet door een lagere tier is tegengehouden.
+        svrl = prefetch_svrl(
+            [(f, [checks[i] for i in idx
+                  if not blocking(tiers.get(i), upstream.get(pos, []))])
+             for pos, f, idx in later], verbose)
+        run(later, svrl, upstream, prefetch=False)
+    else:
+        # Zonder Saxon-helper: Schematron voor de hele chunk in een paar Java-runs.
+        run(jobs, prefetch_svrl(
+            [(f, [checks[i] for i in idx]) for _, f, idx in jobs], verbose))
 
     # NB: CSV wordt centraal in main() weggeschreven (één proces), niet hier,
     # om corruptie door gelijktijdig schrijven vanuit workers te voorkomen.
-    return rows
+    return records, xsd_cache_stats - stats_before, rss_growth(rss_before)
+
+
+def run_validations(cfg: dict, record, logger, timing=None, completed=None):
+    """Ontdek, plan en valideer alle bestanden; geeft XSD-cachestatistiek terug.
+
+    Elke lijst resultaatregels gaat direct naar `record` zodra hij binnenkomt
+    (in het hoofdproces), dus main() hoeft niets te verzamelen. Discovery is
+    lui: de batches worden één keer doorlopen terwijl de workers al valideren.
+    Met een TimingSummary (`timing`) worden ook de run-fasen bijgehouden. Met
+    `completed` (journal.CompletedWork, bij --resume) vallen validaties die
+    de afgebroken run al deed weg.
+
+    Met `cfg["watch"]` stopt de run niet na de eerste discovery: een
+    watch.Watcher levert daarna nieuwe en gewijzigde bestanden aan dezelfde
+    (warme) pool, tot Ctrl-C. Chunks die dan nog onderweg zijn vervallen; met
+    --incremental worden ze bij een volgende start opnieuw gevalideerd.
+
+    Sterft een worker (bv. door de OOM-killer), dan is de pool kapot en gaat
+    de run verder in een nieuwe pool. De chunks die onderweg waren gaan daar
+    nog één keer heen; gaan ze ook dan verloren, dan krijgen hun bestanden
+    regels met status error.
+    """
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+    from concurrent.futures.process import BrokenProcessPool
+    from contextlib import ExitStack
+
+    from tqdm import tqdm
+    from xml_validator.index import INDEX_NAME, ResultIndex
+    from xml_validator.validate import configure_catalog
+
+    # Elk schema één keer voorbereiden in het hoofdproces. Schematron's worden
+    # hier getranspileerd (met cache: vóór de pool start, zodat workers nooit
+    # tegelijk hetzelfde schema transpileren).
+    schematron_cache = (Path(cfg["schematron_cache"])
+                        if cfg["schematron_cache"] else None)
+    # Remote XSD-imports via de catalogus; ook hier, voor de fingerprints
+    # van de resultatenindex.
+    catalog = build_catalog(cfg)
+    configure_catalog(catalog)
+    checks = {}
+    check_errors = {}
+    start = time.perf_counter()
+    for i, val in enumerate(cfg["validations"]):
+        checks[i], check_errors[i] = prepare_check(
+            Path(val["schema"]), cfg["verbose"], schematron_cache,
+            cfg["schematron_engine"])
+    if timing is not None:
+        timing.add_run_phase("schema preparation", time.perf_counter() - start)
+    tiers = {i: val["tier"] for i, val in enumerate(cfg["validations"])
+             if val.get("tier") is not None}
+
+    # Watch: de watcher bewaakt de mappen al tijdens de eerste discovery, zodat
+    # er niets tussen discovery en bewaken door glipt.
+    watcher = None
+    if cfg["watch"]:
+        from xml_validator.watch import Watcher
+
+        watcher = Watcher(cfg["batches"], cfg["validations"], cfg["recursive"],
+                          cfg["watch_interval"], cfg["watch_debounce"],
+                          cfg["watch_inotify"])
+        logger.info(f"Watch: {watcher.mode}, debounce {watcher.debounce:g}s.")
+
+    def batch_done(batch, used, rows):
+        # Meldingen over een onbruikbaar schema komen zoals voorheen één keer
+        # per batch in de CSV, alleen voor batches met passende bestanden.
+        # Een (nog) lege landingsmap is bij --watch geen melding waard.
+        if watcher is None:
+            record(rows)
+        for i in sorted(used):
+            record([dict(r) for r in check_errors[i]])
+
+    discovery = Discovery(cfg["batches"], cfg["validations"], cfg["recursive"],
+                          on_batch_done=batch_done)
+
+    # Incrementeel: ongewijzigde bestanden (zelfde grootte, mtime en schema-
+    # fingerprint) krijgen hun vorige resultaat en gaan niet naar de workers.
+    index = None
+    reused = 0
+    if cfg["incremental"]:
+        index = ResultIndex(cfg["output"] / INDEX_NAME, cfg["validations"],
+                            cfg["max_errors_per_file"], bool(cfg["fail_fast"]),
+                            cfg["output_format"] != ["csv"])
+
+    # Dedup: byte-identieke bestanden één keer per schema valideren; kopieën
+    # krijgen het resultaat van het origineel (zie dedup.Deduplicator).
+    dedup = Deduplicator(cfg["validations"], record) if cfg["dedup"] else None
+
+    def watched_windows():
+        # Na de discovery: steeds wat de watcher nu klaar heeft (ook leeg).
+        while True:
+            yield watcher.poll()
+
+    discovered = 0
+
+    def work_windows():
+        nonlocal reused, discovered
+        if watcher is None:
+            found = windows(discovery, cfg["discovery_window"])
+        else:
+            found = chain(windows(watcher.track(discovery), cfg["discovery_window"]),
+                          watched_windows())
+        for window in found:
+            discovered += len(window)
+            if completed is not None:
+                window = completed.filter(window)
+            if index is not None:
+                window, n = index.reuse(window, record)
+                reused += n
+            if dedup is not None:
+                window = dedup.filter(window)
+            yield window
+
+    # Na het eerste venster wordt het aantal workers bepaald: is de walk dan al
+    # klaar, dan telt het aantal gevonden bestanden (vóór resume, index en
+    # dedup: die kunnen een eerste venster bijna leeg laten terwijl er nog
+    # veel werk komt); anders zijn het er in elk geval "veel" en geldt de
+    # bovengrens van determine_workers.
+    window_iter = work_windows()
+    first = next(window_iter, [])
+    while not first and not discovery.finished:
+        first = next(window_iter, [])
+    # Bij --watch is niet te zeggen hoeveel bestanden er nog komen.
+    workers, reason = determine_workers(
+        discovered if watcher is None and discovery.finished else sys.maxsize,
+        cfg["jobs"])
+    logger.info(f"Using {workers} parallel workers ({reason}).")
+
+    def chunk_stream(progress):
+        window = first
+        while True:
+            if window:
+                progress.total += len(window)
+                progress.refresh()
+            yield from plan_chunks(window, workers, cfg["chunk_bytes"],
+                                   cfg["chunk_files"])
+            window = next(window_iter, None)
+            if window is None:
+                return
+            if not window and watcher is not None:
+                # Nu niets klaar: submit_more stopt tot de volgende ronde.
+                yield None
+
+    # Elke worker compileert de XSD's één keer vooraf en houdt ze in cache.
+    xsd_schemas = sorted({
+        v["schema"] for v in cfg["validations"]
+        if Path(v["schema"]).suffix.lower() == ".xsd"
+    })
+    # Het Java-classpath wordt alleen bij Saxon-validaties bepaald, één keer
+    # hier (prepare_check had het al nodig) en meegegeven aan de workers.
+    java_classpath = (classpath() if any(check and check[0] == "Schematron"
+                                         for check in checks.values()) else None)
+
+    # Fail-fast: de workers tellen falende bestanden samen en stoppen per
+    # bestand zodra de drempel gehaald is (zie process_chunk).
+    failures = FailureCounter(cfg["fail_fast"]) if cfg["fail_fast"] else None
+
+    def start_pool():
+        return pools.enter_context(ProcessPoolExecutor(
+            max_workers=workers, initializer=init_worker,
+            initargs=(xsd_schemas, cfg["xsd_cache_size"],
+                      cfg["saxon_server"], cfg["stream_threshold"],
+                      cfg["saxon_batch_size"],
+                      cfg["output_format"] != ["csv"],
+                      cfg["max_errors_per_file"],
+                      bool(cfg["fail_fast"]), catalog,
+                      java_classpath, watcher is not None,
+                      failures)))
+
+    cache_stats = Counter()
+    pool_start = time.perf_counter()
+    # Een kapotte pool wordt vervangen (zie submit); de ExitStack sluit ze
+    # allemaal af.
+    with ExitStack() as pools, \
+            tqdm(total=0, desc="Validating", unit="file") as progress:
+        executor = start_pool()
+        # Niet alles tegelijk indienen: hooguit een paar chunks per worker
+        # onderweg, zodat ook de wachtende resultaten het geheugen niet vullen.
+        # Nieuwe chunks trekken de discovery verder.
+        pending = {}
+        chunk_iter = chunk_stream(progress)
+        max_pending = workers * 4
+        done_count = 0
+
+        # Fail-fast: na `fail_fast` bestanden met invalid/error niets meer
+        # indienen en wachtende chunks annuleren; lopende chunks slaan hun
+        # resterende bestanden over.
+        stopping = False
+
+        # Met een geheugenbudget start een chunk pas als zijn schatting past.
+        # Chunks die niet passen wachten in `deferred` en gaan vóór nieuwe
+        # chunks zodra er ruimte is; kleinere chunks mogen ze intussen inhalen.
+        budget = None
+        if cfg["max_memory"]:
+            budget = MemoryBudget(
+                cfg["max_memory"], cfg["stream_threshold"],
+                prefetch_bytes=cfg["prefetch_bytes"] or 0,
+                tree_checks=[i for i, check in checks.items()
+                             if check and check[0] == "SchematronNative"])
+        deferred = []
+        estimates = {}
+
+        # Chunks die met een kapotte pool verloren gingen: nog één poging.
+        retry = []
+        retried = set()
+
+        def submit(chunk, estimate):
+            nonlocal executor
+            args = (process_chunk, chunk, checks, cfg["verbose"],
+                    cfg["timings"], cfg["prefetch_bytes"], tiers)
+            try:
+                future = executor.submit(*args)
+            except BrokenProcessPool:
+                # Een worker is gestorven; wat nog onderweg was komt als
+                # BrokenProcessPool binnen (zie hieronder), nieuw werk gaat
+                # naar een nieuwe pool.
+                logger.warning("Worker pool broken; starting a new one.")
+                executor = start_pool()
+                future = executor.submit(*args)
+            pending[future] = chunk
+            estimates[future] = estimate
+            if budget is not None:
+                budget.acquire(estimate)
+            return future
+
+        def submit_more():
+            if stopping:
+                return
+            while retry and len(pending) < max_pending:
+                retried.add(submit(*retry.pop(0)))
+            if budget is None:
+                for chunk in chunk_iter:
+                    if chunk is None:
+                        return
+                    submit(chunk, 0)
+                    if len(pending) >= max_pending:
+                        break
+                return
+
+            for chunk in list(deferred):
+                if len(pending) >= max_pending:
+                    return
+                estimate = budget.estimate(chunk)
+                if budget.fits(estimate):
+                    deferred.remove(chunk)
+                    submit(chunk, estimate)
+            while len(pending) < max_pending and len(deferred) < max_pending:
+                chunk = next(chunk_iter, None)
+                if chunk is None:
+                    return
+                estimate = budget.estimate(chunk)
+                if budget.fits(estimate):
+                    submit(chunk, estimate)
+                else:
+                    deferred.append(chunk)
+
+        submit_more()
+        try:
+            while pending or (watcher is not None and not stopping):
+                if not pending:
+                    # Watch: niets onderweg; wachten op nieuwe bestanden.
+                    watcher.wait()
+                    submit_more()
+                    continue
+                done, _ = wait(pending, return_when=FIRST_COMPLETED,
+                               timeout=None if watcher is None else watcher.interval)
+                for future in done:
+                    chunk = pending.pop(future)
+                    estimate = estimates.pop(future)
+                    second_try = future in retried
+                    retried.discard(future)
+                    done_count += 1
+                    try:
+                        records, stats, growth = future.result()
+                        rows = unpack_records(chunk, records, checks)
+                        if budget is not None:
+                            budget.observe(chunk, growth)
+                        record(rows)
+                        if dedup is not None:
+                            dedup.completed(chunk, rows)
+                        cache_stats.update(stats)
+                        if index is not None:
+                            index.update(chunk, rows)
+                        logger.debug(f"[{done_count}] Done: chunk of {len(chunk)} files")
+                    except BrokenProcessPool as e:
+                        # De worker stierf (bv. OOM-killer) of de pool was al
+                        # kapot. Welke chunk de oorzaak was is niet te zeggen:
+                        # elke getroffen chunk krijgt nog één kans.
+                        if not second_try and not stopping:
+                            logger.warning(f"[{done_count}] Worker died; retrying chunk "
+                                           f"starting at {chunk[0][0]}.")
+                            retry.append((chunk, estimate))
+                            continue
+                        logger.error(f"[{done_count}] Worker died again; chunk starting at "
+                                     f"{chunk[0][0]} reported as error: {e}")
+                        rows = unpack_records(chunk, error_records(
+                            chunk, checks, f"Worker process died: {e}"), checks)
+                        record(rows)
+                        if dedup is not None:
+                            dedup.completed(chunk, rows)
+                        if failures is not None:
+                            failures.add(len(chunk))
+                    except Exception as e:
+                        logger.error(f"[{done_count}] Error in chunk starting at {chunk[0][0]}: {e}")
+                        if dedup is not None:
+                            dedup.failed(chunk)
+                    finally:
+                        if budget is not None:
+                            budget.release(estimate)
+                    progress.update(len(chunk))
+                if failures is not None and not stopping and failures.reached:
+                    stopping = True
+                    cancelled = [f for f in pending if f.cancel()]
+                    for future in cancelled:
+                        del pending[future]
+                        estimate = estimates.pop(future)
+                        retried.discard(future)
+                        if budget is not None:
+                            budget.release(estimate)
+                    logger.warning(
+                        f"Fail-fast: {failures.count} failing file(s); stopped the "
+                        f"run, {len(cancelled) + len(deferred) + len(retry)} queued "
+                        f"chunk(s) cancelled.")
+                    deferred.clear()
+                    retry.clear()
+                submit_more()
+        except KeyboardInterrupt:
+            if watcher is None:
+                raise
+            # Watch stopt met Ctrl-C (de workers negeren die zelf): wat nog
+            # onderweg is vervalt en komt niet in de log of de index.
+            for future in pending:
+                future.cancel()
+            logger.info(f"\nWatch stopped; {len(pending) + len(deferred) + len(retry)} "
+                        f"unfinished chunk(s) discarded.")
+            pending.clear()
+            deferred.clear()
+            retry.clear()
+
+    if watcher is not None:
+        watcher.close()
+
+    if budget is not None:
+        logger.info(f"Memory budget: {cfg['max_memory']} bytes, estimated "
+                    f"{budget.factor:.1f}× file size per parsed file"
+                    f"{'' if budget.observed else ' (not measured)'}.")
+
+    if timing is not None:
+        timing.add_run_phase("discovery", discovery.seconds)
+        timing.add_run_phase("wall clock (pool)", time.perf_counter() - pool_start)
+
+    if completed is not None:
+        logger.info(f"Resume: skipped {completed.skipped} validations "
+                    f"from the interrupted run.")
+
+    if dedup is not None:
+        # Kopieën van originelen die niet meer aan de beurt kwamen: skipped.
+        dedup.finish("fail-fast" if stopping
+                     else "watch stopped" if watcher is not None else None)
+        logger.info(f"Dedup: {dedup.skipped} validations copied from identical files.")
+
+    if index is not None:
+        logger.info(f"Incremental: reused {reused} results.")
+        index.close()
+
+    # Zonder cache zijn de gecompileerde XSL's tijdelijke bestanden.
+    if schematron_cache is None:
+        for i, check in checks.items():
+            if (check and check[0] == "Schematron"
+                    and Path(cfg["validations"][i]["schema"]).suffix.lower() == ".sch"):
+                check[1].unlink(missing_ok=True)
+
+    return cache_stats if xsd_schemas else None
 
 
 def main():
@@ -283,70 +988,166 @@ def main():
         print("Effective configuration:\n")
         print(f"Batches: {cfg['batches']}")
         print(f"Output: {cfg['output']}")
+        print(f"Output format: {', '.join(cfg['output_format'])}")
         print(f"Verbose: {cfg['verbose']}")
         print(f"Jobs: {cfg['jobs']}")
         print(f"Recursive: {cfg['recursive']}")
+        print(f"Incremental: {cfg['incremental']}")
+        print(f"Timings: {cfg['timings']}")
+        print(f"Max errors per file: {cfg['max_errors_per_file'] or 'unlimited'}")
+        print(f"Fail-fast: {cfg['fail_fast'] or 'off'}")
+        print(f"Dedup: {cfg['dedup']}")
         print(f"Log path: {cfg['log_path']}")
         print(f"Log size: {cfg['log_size']}")
         print(f"Log backups: {cfg['log_backups']}")
+        print(f"XSD cache size: {cfg['xsd_cache_size']}")
+        print(f"Saxon server: {cfg['saxon_server']}")
+        print(f"Saxon batch size: {cfg['saxon_batch_size']}")
+        print(f"Schematron cache: {cfg['schematron_cache']}")
+        print(f"Schematron engine: {cfg['schematron_engine']}")
+        print(f"Chunk size: {cfg['chunk_bytes']} bytes / {cfg['chunk_files']} files")
+        print(f"Stream threshold: {cfg['stream_threshold']} bytes")
+        print(f"Max memory: {cfg['max_memory'] or 'unlimited'}")
+        print(f"Prefetch: {cfg['prefetch_bytes'] or 'off'}")
+        print(f"Watch: {cfg['watch']} (interval {cfg['watch_interval']:g}s, "
+              f"debounce {cfg['watch_debounce']:g}s, log {cfg['watch_log_pattern']})")
+        print(f"Schema bundle: {cfg['schema_bundle']}")
+        print(f"XML catalogs: {cfg['xml_catalogs']}")
+        print(f"Schema catalog: {cfg['schema_catalog']}")
         print("\nValidations to run:")
         for i, val in enumerate(cfg["validations"], 1):
-            print(f"  {i}. pattern={val['pattern']}  schema={val['schema']}")
+            tier = f"  tier={val['tier']}" if val.get("tier") is not None else ""
+            print(f"  {i}. pattern={val['pattern']}  schema={val['schema']}{tier}")
         sys.exit(0)
 
+    if args.bundle_schemas is not None:
+        from xml_validator.catalog import bundle_schemas, load_catalog
+
+        bundle_dir = Path(args.bundle_schemas or cfg["schema_bundle"] or "schema-bundle")
+        xsd_schemas = sorted({v["schema"] for v in cfg["validations"]
+                              if Path(v["schema"]).suffix.lower() == ".xsd"})
+        catalog_path, downloaded, failed = bundle_schemas(
+            xsd_schemas, bundle_dir,
+            load_catalog(cfg["xml_catalogs"], cfg["schema_catalog"]))
+        for url in downloaded:
+            print(f"Downloaded {url}")
+        for url, error in failed:
+            print(f"Failed {url}: {error}")
+        print(f"Schema bundle catalog written to: {catalog_path.resolve()}")
+        if (not cfg["schema_bundle"]
+                or Path(cfg["schema_bundle"]).resolve() != bundle_dir.resolve()):
+            print(f"Set 'schema_bundle: {bundle_dir}' in config.yaml to use it.")
+        sys.exit(1 if failed else 0)
+
+    if cfg["watch"] and args.resume:
+        print("--watch cannot be combined with --resume (use --incremental).")
+        sys.exit(2)
+
     output = cfg["output"]
     output.mkdir(parents=True, exist_ok=True)
 
     log_dir = Path(cfg["log_path"])
     logger = setup_logging(log_dir, cfg["log_size"], cfg["log_backups"])
 
-    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-    log_path = output / f"validation_log_{timestamp}.csv"
+    # De run-id is het tijdstip van de (eerste) start; --resume gebruikt die
+    # van de afgebroken run en schrijft naar dezelfde logs.
+    run_id = args.resume or datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    log_base = output / f"validation_log_{run_id}"
+    journal_file = journal_path(output, run_id)
+    header = {"run_id": run_id,
+              **{key: cfg[key] for key in RESUME_KEYS + OUTPUT_KEYS}}
+    previous = []
+    if args.resume:
+        if not journal_file.exists():
+            logger.error(f"Resume: no journal for run '{run_id}' in {output}.")
+            sys.exit(2)
+        saved, previous = load_journal(journal_file)
+        changed = [key for key in RESUME_KEYS
+                   if saved.get(key) != json_roundtrip(cfg[key])]
+        if changed:
+            logger.error(f"Resume: {', '.join(changed)} differ(s) from run "
+                         f"'{run_id}'; use the same configuration.")
+            sys.exit(2)
+        # Zelfde uitvoer als de oorspronkelijke run; de logs worden uit het
+        # journaal opnieuw opgebouwd (een afgebroken Parquet is onleesbaar).
+        cfg.update({key: saved[key] for key in OUTPUT_KEYS})
+        for fmt in cfg["output_format"]:
+            log_base.with_suffix(EXTENSIONS[fmt]).unlink(missing_ok=True)
+        logger.info(f"Resuming run {run_id}: {len(previous)} results in journal.")
+    else:
+        logger.info(f"Run id: {run_id}")
 
-    total_tasks = len(cfg["batches"]) * len(cfg["validations"])
-    workers, reason = determine_workers(len(cfg["batches"]), cfg["jobs"])
-    logger.info(f"Using {workers} parallel workers for {total_tasks} tasks ({reason}).")
+    # Eenmalige check: ontbreekt Java terwijl er Schematron's via Saxon lopen?
+    # Schematron's die de native engine aankan hebben geen Java nodig.
+    if shutil.which("java") is None:
+        needs_java = sorted({
+            Path(v["schema"]).name for v in cfg["validations"]
+            if uses_saxon(Path(v["schema"]), cfg["schematron_engine"])})
+        if needs_java:
+            logger.error(
+                f"LET OP: 'java' niet gevonden op PATH. De Schematron-validaties "
+                f"via Saxon worden overgeslagen ({', '.join(needs_java)}); "
+                f"XSD- en native Schematron-validaties draaien gewoon door. "
+                f"Installeer Java en zorg dat de Saxon-jar in xml_validator/lib staat."
+            )
 
-    # Eenmalige check: zijn er schematron-schema's én ontbreekt Java?
-    needs_java = any(
-        Path(v["schema"]).suffix.lower() in {".sch", ".xsl", ".xslt"}
-        for v in cfg["validations"]
-    )
-    if needs_java and shutil.which("java") is None:
-        logger.error(
-            "LET OP: 'java' niet gevonden op PATH. Alle Schematron-validaties "
-            "worden overgeslagen (XSD-validaties draaien gewoon door). "
-            "Installeer Java en zorg dat de Saxon-jar in xml_validator/lib staat."
-        )
-
-    all_rows = []
-    with ProcessPoolExecutor(max_workers=workers) as executor:
-        futures = {}
-        for batch in cfg["batches"]:
-            for val in cfg["validations"]:
-                schema_path = Path(val["schema"])
-                futures[executor.submit(
-                    process_batch, Path(batch), schema_path, val["pattern"],
-                    cfg["verbose"], cfg["recursive"]
-                )] = (batch, schema_path.name)
-
-        for i, future in enumerate(tqdm(as_completed(futures), total=len(futures), desc="Validating")):
-            batch, schema_name = futures[future]
-            try:
-                rows = future.result()
-                all_rows.extend(rows)
-                logger.info(f"[{i+1}/{len(futures)}] Done: {Path(batch).name} ({schema_name})")
-            except Exception as e:
-                logger.error(f"[{i+1}/{len(futures)}] Error in {Path(batch).name} ({schema_name}): {e}")
+    # Resultaten gaan direct (gebufferd) naar de log(s) zodra ze binnenkomen;
+    # de samenvatting telt mee. Zo blijft het geheugen vlak en laat ook een
+    # afgebroken run een log achter.
+    summary = Counter()
+    if cfg["watch"]:
+        # Watch: doorlopende logs per periode (zie watch_log_pattern), direct
+        # geflusht. Geen journaal: een herstart gebruikt --incremental.
+        results = RollingLogWriter(cfg["output_format"], output,
+                                   cfg["watch_log_pattern"],
+                                   timings=cfg["timings"], dedup=cfg["dedup"])
+        journal = None
+    else:
+        results, log_paths = open_log_writers(
+            cfg["output_format"], log_base, timings=cfg["timings"], dedup=cfg["dedup"])
+        # Elk resultaat gaat ook naar het journaal, voor --resume na een kill.
+        journal = RunJournal(journal_file, header)
+    timing = TimingSummary() if cfg["timings"] else None
+
+    def record(rows, journaled: bool = False):
+        results.write(rows)
+        if journal is not None and not journaled:
+            journal.write(rows)
+        summary.update(row["status"] for row in rows)
+        if timing is not None:
+            timing.add(rows)
 
-    # Schrijf alle resultaten in één keer weg vanuit het hoofdproces.
-    write_csv_log(all_rows, log_path)
+    finished = False
+    try:
+        record(previous, journaled=True)
+        cache_stats = run_validations(
+            cfg, record, logger, timing,
+            CompletedWork(previous, cfg["validations"]) if args.resume else None)
+        finished = True
+    except KeyboardInterrupt:
+        if journal is None:
+            logger.warning("\nInterrupted.")
+        else:
+            logger.warning(f"\nInterrupted; continue with --resume {run_id}")
+        sys.exit(130)
+    finally:
+        results.close()
+        # Een voltooide run heeft het journaal niet meer nodig.
+        if journal is not None:
+            journal.close(remove=finished)
 
-    summary = Counter(row["status"] for row in all_rows)
     logger.info("\nSummary:")
     for k, v in summary.items():
         logger.info(f"  {k}: {v}")
+    if cache_stats is not None:
+        logger.info(f"  XSD schema cache: {cache_stats['hits']} hits, "
+                    f"{cache_stats['misses']} misses")
+    if timing is not None:
+        timing.log(logger)
 
-    logger.info(f"\nCSV log written to: {log_path.resolve()}")
-    sys.exit(1 if any(r["status"] in ("invalid", "error")
-                      for r in all_rows) else 0)
+    logger.info("")
+    if cfg["watch"]:
+        log_paths = results.paths
+    for path in log_paths:
+        logger.info(f"{path.suffix[1:].upper()} log written to: {path.resolve()}")
+    sys.exit(1 if summary["invalid"] or summary["error"] else 0)
@@ -2,10 +2,56 @@ import os
 from pathlib import Path
 
 # Namespace used in SVRL reports.
-# (Het SVRL-rapport zelf gaat per validatie naar een uniek temp-bestand,
-#  zie validate_single_sch, om races bij parallel draaien te voorkomen.)
+# (Het SVRL-rapport komt in het geheugen binnen via stdout of de Saxon-helper,
+#  zie validate_single_sch; er worden geen temp-bestanden per validatie gemaakt.)
 SVRL_NS = {"svrl": "http://purl.oclc.org/dsdl/svrl"}
 
+# Schematron-engine: "native" (lxml, alleen XPath 1.0, geen Java), "saxon"
+# (SchXslt2 + Saxon) of "auto" (native als de .sch dat toelaat, anders Saxon).
+SCHEMATRON_ENGINE = "auto"
+
+# Maximaal aantal meldingen (XSD-fouten, failed-asserts/successful-reports) per
+# validatie van een bestand in de details; de rest wordt alleen geteld.
+# Overschrijfbaar via `max_errors_per_file`.
+MAX_ERRORS_PER_FILE = 1000
+
+# Namespace van XML Schema; gebruikt om includes/imports van een XSD te volgen.
+XSD_NS = {"xs": "http://www.w3.org/2001/XMLSchema"}
+
+# Maximaal aantal gecompileerde XSD's dat één worker in het geheugen houdt
+# (LRU, zie validate.get_xsd_schema). Overschrijfbaar via `xsd_cache_size`.
+XSD_CACHE_SIZE = 16
+
+# Bestanden vanaf deze grootte (bytes) worden tijdens het parsen tegen de XSD
+# gevalideerd zonder boom op te bouwen (zie validate.validate_single_xsd), zodat
+# het geheugen per worker begrensd blijft. Overschrijfbaar via `stream_threshold`.
+STREAM_THRESHOLD = 256 * 1024 * 1024
+
+# Per worker leest een thread de volgende bestanden van een chunk vooruit in,
+# tot zoveel bytes (zie prefetch.Prefetcher). 0 = uit. Via `prefetch_bytes`.
+PREFETCH_BYTES = 64 * 1024 * 1024
+
+# Startschatting voor het geheugen van een geparst bestand, als veelvoud van de
+# bestandsgrootte (lxml-bomen zijn vele malen groter dan de XML zelf). Bij een
+# geheugenbudget (`max_memory`) wordt dit bijgesteld met gemeten pieken.
+MEMORY_FACTOR = 20
+
+# Werkverdeling: bestanden worden gebundeld tot chunks van maximaal zoveel
+# bytes/bestanden (zie scheduler.plan_chunks). Overschrijfbaar in config.yaml.
+CHUNK_BYTES = 64 * 1024 * 1024
+CHUNK_FILES = 200
+
+# Discovery levert bestanden lui aan; per venster van zoveel bestanden worden
+# chunks gepland (grootste-eerst binnen het venster).
+DISCOVERY_WINDOW = 10000
+
+# --watch: zo vaak (seconden) de batchmappen vergelijken als inotify niet
+# beschikbaar is, en zo lang moet een bestand onveranderd zijn voordat het
+# gevalideerd wordt. Logs rollen per naam (strftime), standaard per dag.
+WATCH_INTERVAL = 1.0
+WATCH_DEBOUNCE = 2.0
+WATCH_LOG_PATTERN = "validation_log_watch_%Y-%m-%d"
+
 # ---------------- Dependency settings ---------------- #
 
 BASE_DIR = Path(__file__).resolve().parent
@@ -18,9 +64,43 @@ SAXON_VERSION = "12.5"
 SCHXSLT_VERSION = "1.4.4"
 SCHXSLT_TRANSPILER = BASE_DIR / "schxslt" / "transpile.xsl"
 
+# Langlevende Saxon-helper (zie saxon.py). download_dependencies.py compileert
+# de bron naar lib/classes als er een javac beschikbaar is.
+SAXON_SERVER_SOURCE = BASE_DIR / "java" / "SaxonServer.java"
+SAXON_SERVER_CLASSES = LIB_DIR / "classes"
+
+# Zonder helper: zoveel bestanden per Java-proces via de batch-driver
+# (zie saxon.run_saxon_batch). Overschrijfbaar via `saxon_batch_size`.
+SAXON_BATCH_DRIVER = BASE_DIR / "xslt" / "batch.xsl"
+SAXON_BATCH_SIZE = 50
+
 # xmlresolver (needed for Saxon >= 12)
 XMLRESOLVER_VERSION = "5.2.2"
 
 # Build classpath: all jars inside lib/
 # (Saxon + xmlresolver jars are put here by download_dependencies.py)
-CLASSPATH = os.pathsep.join(str(jar.resolve()) for jar in LIB_DIR.glob("*.jar"))
+# Pas bij het eerste Schematron-gebruik bepaald (zie classpath()), zodat het
+# importeren van de package en XSD-only workers lib/ niet hoeven te scannen.
+_classpath = None
+
+
+def classpath() -> str:
+    """Classpath voor Java; één keer opgebouwd en daarna hergebruikt."""
+    global _classpath
+    if _classpath is None:
+        _classpath = os.pathsep.join(
+            str(jar.resolve()) for jar in LIB_DIR.glob("*.jar"))
+    return _classpath
+
+
+def set_classpath(value: str | None):
+    """Neem een elders (in het hoofdproces) bepaald classpath over."""
+    global _classpath
+    _classpath = value
+
+
+def __getattr__(name):
+    # `config.CLASSPATH` blijft werken, maar wordt nu lui bepaald.
+    if name == "CLASSPATH":
+        return classpath()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
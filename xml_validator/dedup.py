@@ -0,0 +1,153 @@
+import hashlib
+import mmap
+import os
+from pathlib import Path
+
+
+def content_hash(path) -> str | None:
+    """Snelle hash (BLAKE2b) over de inhoud via mmap; None als lezen mislukt."""
+    try:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return hashlib.blake2b(b"", digest_size=16).hexdigest()
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                return hashlib.blake2b(m, digest_size=16).hexdigest()
+    except (OSError, ValueError):
+        return None
+
+
+class Deduplicator:
+    """Valideer byte-identieke bestanden één keer per (inhoud, schema).
+
+    Werkt in het hoofdproces op de stroom werkeenheden `(pad, grootte,
+    mtime_ns, indices)`. Alleen bestanden waarvan de grootte al eerder voorkwam
+    worden gehasht. Per (hash, validatie) valideert het eerste bestand (de
+    representant); de andere krijgen diens regel, met `duplicate_of` ingevuld,
+    zodra die binnen is (zie `completed`).
+
+    Binnen één discovery-venster wordt elke dubbele inhoud gevonden. Was het
+    eerste bestand van een grootte in een eerder venster al klaar voordat een
+    kopie opdook, dan valideert die kopie nog één keer zelf en is zij de
+    representant voor volgende kopieën.
+    """
+
+    def __init__(self, validations, record):
+        self.names = [Path(v["schema"]).name for v in validations]
+        self.record = record
+        self.by_size = {}     # grootte -> pad van het nog niet gehashte eerste bestand, of None
+        self.sizes = {}       # pad van een eerste bestand -> (grootte, indices)
+        self.digests = {}     # pad van een representant in behandeling -> hash
+        self.reps = {}        # (hash, index) -> pad van de representant
+        self.results = {}     # (hash, index) -> regel van de representant
+        self.waiting = {}     # (hash, index) -> paden van kopieën
+        self.errored = set()  # paden van representanten waarvan de chunk faalde
+        self.skipped = 0
+
+    def _register(self, path: str, digest: str, hits) -> tuple:
+        """Meld een bestand aan; geeft de indices die het zelf moet valideren."""
+        todo = []
+        for i in hits:
+            key = (digest, i)
+            if key not in self.reps:
+                self.reps[key] = path
+                self.digests[path] = digest
+                todo.append(i)
+            elif key in self.results:
+                self._copy(self.results[key], path)
+            else:
+                self.waiting.setdefault(key, []).append(path)
+        return tuple(todo)
+
+    def _copy(self, row, path: str):
+        copy = dict(row, file=path, duplicate_of=str(row["file"]))
+        copy.pop("timings", None)
+        self.record([copy])
+        self.skipped += 1
+
+    def filter(self, items):
+        """Haal kopieën uit een venster werkeenheden; geeft de rest terug."""
+        sizes = {}
+        for item in items:
+            sizes[item[1]] = sizes.get(item[1], 0) + 1
+
+        remaining = []
+        for f, size, mtime, hits in items:
+            path = str(f)
+            first = self.by_size.get(size, False)
+            if first is False and sizes[size] == 1:
+                # Unieke grootte (tot nu toe): niet hashen, wel onthouden.
+                self.by_size[size] = path
+                self.sizes[path] = (size, hits)
+                remaining.append((f, size, mtime, hits))
+                continue
+            if first:
+                # Tweede bestand met deze grootte: nu ook het eerste hashen.
+                self.by_size[size] = None
+                _, first_hits = self.sizes.pop(first)
+                digest = content_hash(first)
+                if digest is not None:
+                    self._register(first, digest, first_hits)
+            self.by_size[size] = None
+            digest = content_hash(f)
+            todo = hits if digest is None else self._register(path, digest, hits)
+            if todo:
+                remaining.append((f, size, mtime, todo))
+        return remaining
+
+    def completed(self, chunk, rows):
+        """Verwerk de regels van een klaar chunk en vul wachtende kopieën."""
+        by_file = {}
+        for row in rows:
+            by_file.setdefault(str(row["file"]), []).append(row)
+        for f, size, _, hits in chunk:
+            path = str(f)
+            if path in self.sizes:
+                # Eerste bestand van zijn grootte is klaar zonder hash: het kan
+                # geen representant meer worden.
+                del self.sizes[path]
+                self.by_size[size] = None
+            digest = self.digests.pop(path, None)
+            if digest is None:
+                continue
+            for row in by_file.get(path, []):
+                matches = [i for i in hits if self.names[i] == row["schema"]]
+                if len(matches) != 1:
+                    continue
+                key = (digest, matches[0])
+                if self.reps.get(key) != path:
+                    continue
+                self.results[key] = row
+                for dup in self.waiting.pop(key, []):
+                    self._copy(row, dup)
+
+    def failed(self, chunk):
+        """Onthoud dat de validatie van een chunk met een exception stopte."""
+        self.errored.update(str(f) for f, _, _, _ in chunk)
+
+    def finish(self, reason: str | None = None):
+        """Regels voor kopieën waarvan de representant geen resultaat gaf.
+
+        Faalde de chunk van de representant (zie `failed`), dan krijgen ze
+        status error. Anders is het origineel nooit gevalideerd (bv. een door
+        fail-fast geannuleerde chunk) en zijn ze skipped, met `reason` in de
+        details.
+        """
+        for (digest, i), paths in self.waiting.items():
+            original = self.reps[(digest, i)]
+            if original in self.errored:
+                status = "error"
+                details = "Duplicate content; the original file could not be validated"
+            else:
+                status = "skipped"
+                details = "Duplicate content; original not validated" + (
+                    f" ({reason})" if reason else "")
+            for path in paths:
+                self.record([{
+                    "file": path,
+                    "schema": self.names[i],
+                    "validation_type": "N/A",
+                    "status": status,
+                    "details": details,
+                    "duplicate_of": original,
+                }])
+        self.waiting.clear()
@@ -0,0 +1,125 @@
+import logging
+import os
+import re
+import time
+from pathlib import Path
+
+
+def scan_files(root: str, recursive: bool):
+    """Loop een map af met os.scandir en geef `(pad, naam, entry)` per bestand.
+
+    Goedkoper dan Path.rglob: geen Path-object per entry en het bestandstype
+    komt meestal gratis uit readdir mee (belangrijk op NFS).
+    """
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        entries.sort(key=lambda e: e.name)
+        subdirs = []
+        for entry in entries:
+            try:
+                if entry.is_file():
+                    yield entry.path, entry.name, entry
+                elif recursive and entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+            except OSError:
+                continue
+        stack.extend(reversed(subdirs))
+
+
+class PatternMatcher:
+    """Match een bestandsnaam in één keer tegen alle validatie-patterns.
+
+    Eén gecombineerde regex dient als snelle voorselectie (de meeste entries,
+    zoals images, vallen direct af); daarna wordt per uniek pattern bepaald
+    welke validaties bij het bestand horen.
+    """
+
+    def __init__(self, validations):
+        by_pattern = {}
+        for i, val in enumerate(validations):
+            by_pattern.setdefault(val["pattern"] or r".*\.xml$", []).append(i)
+        self.patterns = [(re.compile(p), tuple(idx)) for p, idx in by_pattern.items()]
+        try:
+            self.combined = re.compile("|".join(f"(?:{p})" for p in by_pattern))
+        except re.error:
+            # bv. patterns met backreferences of inline flags: geen voorselectie
+            self.combined = None
+
+    def match(self, name: str) -> tuple:
+        if self.combined is not None and not self.combined.search(name):
+            return ()
+        hits = []
+        for regex, idx in self.patterns:
+            if regex.search(name):
+                hits.extend(idx)
+        return tuple(sorted(hits))
+
+
+class Discovery:
+    """Eenmalige, luie discovery over alle batches (in het hoofdproces).
+
+    Itereren levert werkeenheden `(pad, grootte, mtime_ns, indices)` op terwijl
+    de mappen nog doorlopen worden, zodat validatie al start vóór de walk klaar
+    is. Na elke batch wordt `on_batch_done(batch, used, rows)` aangeroepen met
+    de gebruikte validatie-indices en skipped-regels voor validaties zonder
+    passende bestanden in die batch. `seconds` houdt bij hoeveel tijd de walk
+    zelf kost (zonder de tijd dat de aanroeper met een item bezig is).
+    """
+
+    def __init__(self, batches, validations, recursive: bool,
+                 on_batch_done=None):
+        self.batches = batches
+        self.validations = validations
+        self.recursive = recursive
+        self.on_batch_done = on_batch_done
+        self.matcher = PatternMatcher(validations)
+        self.finished = False
+        self.seconds = 0.0
+
+    def __iter__(self):
+        logger = logging.getLogger("xml_validator")
+        start = time.perf_counter()
+        for batch in self.batches:
+            batch_path = Path(batch)
+            root = str(batch_path.resolve())
+            used = set()
+            for path, name, entry in scan_files(root, self.recursive):
+                hits = self.matcher.match(name)
+                if not hits:
+                    continue
+                try:
+                    st = entry.stat()
+                    size, mtime = st.st_size, st.st_mtime_ns
+                except OSError:
+                    size, mtime = 0, 0
+                used.update(hits)
+                self.seconds += time.perf_counter() - start
+                yield Path(path), size, mtime, hits
+                start = time.perf_counter()
+
+            rows = []
+            for i, val in enumerate(self.validations):
+                if i in used:
+                    continue
+                msg = (f"No matching files in {batch_path} for pattern "
+                       f"'{val['pattern']}'")
+                rows.append({
+                    "file": "",
+                    "schema": Path(val["schema"]).name,
+                    "validation_type": "N/A",
+                    "status": "skipped",
+                    "details": msg
+                })
+                logger.warning(msg)
+            self.seconds += time.perf_counter() - start
+            if self.on_batch_done is not None:
+                self.on_batch_done(batch, used, rows)
+            start = time.perf_counter()
+        self.seconds += time.perf_counter() - start
+        self.finished = True
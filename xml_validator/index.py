@@ -0,0 +1,185 @@
+import hashlib
+import json
+import sqlite3
+from pathlib import Path
+
+from .config import MAX_ERRORS_PER_FILE
+from .schematron import schematron_dependencies, schematron_fingerprint
+from .validate import xsd_dependencies
+
+# Bestandsnaam van de resultaatindex, naast de CSV-logs in de output-map.
+INDEX_NAME = "validation_index.sqlite"
+
+
+def schema_fingerprint(schema_path: Path) -> str:
+    """Hash over een schema en al zijn lokale includes/imports.
+
+    Verandert het schema of één van zijn includes, dan verandert de hash en
+    worden de bijbehorende resultaten in de index ongeldig.
+    """
+    schema_path = Path(schema_path)
+    suffix = schema_path.suffix.lower()
+    if suffix == ".sch":
+        return schematron_fingerprint(schema_path)
+
+    deps = (xsd_dependencies(schema_path) if suffix == ".xsd"
+            else schematron_dependencies(schema_path))
+    h = hashlib.sha256()
+    for dep in deps:
+        h.update(dep.name.encode("utf-8") + b"\0")
+        h.update(dep.read_bytes())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class ResultIndex:
+    """SQLite-index met eerdere resultaten voor incrementele runs.
+
+    Sleutel is (bestand, schema); een opgeslagen resultaat telt alleen als
+    grootte, mtime en fingerprint nog gelijk zijn. De fingerprint bevat naast
+    het schema ook de foutgrens van de run (`max_errors`, of 1 met
+    `fail_fast`, zie validate.configure_error_limits): een ingekort resultaat
+    komt zo niet terug in een run die alle meldingen wil. Alleen vanuit het
+    hoofdproces gebruiken.
+
+    De gestructureerde meldingen (`row["errors"]`) worden als JSON bewaard.
+    Met `structured_errors` (JSON Lines/Parquet-output) telt een invalid of
+    error zonder opgeslagen meldingen (uit een CSV-run) niet als hit, zodat
+    de uitvoer gelijk is aan die van een volledige run.
+    """
+
+    def __init__(self, path: Path, validations,
+                 max_errors: int | None = MAX_ERRORS_PER_FILE,
+                 fail_fast: bool = False, structured_errors: bool = False):
+        self.structured_errors = structured_errors
+        self.schemas = [str(Path(v["schema"])) for v in validations]
+        self.tiers = [v.get("tier") for v in validations]
+        limit = 1 if fail_fast else (max_errors or "unlimited")
+        self.fingerprints = []
+        for schema in self.schemas:
+            try:
+                self.fingerprints.append(
+                    f"{schema_fingerprint(Path(schema))};max_errors={limit}")
+            except OSError:
+                # Onleesbaar schema: niets hergebruiken, de run meldt de fout.
+                self.fingerprints.append(None)
+        self.conn = sqlite3.connect(str(path))
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                file TEXT NOT NULL,
+                schema TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                fingerprint TEXT NOT NULL,
+                validation_type TEXT NOT NULL,
+                status TEXT NOT NULL,
+                details TEXT NOT NULL,
+                errors TEXT,
+                PRIMARY KEY (file, schema)
+            )
+        """)
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(results)")]
+        if "errors" not in columns:
+            # Index van een oudere versie: kolom toevoegen (leeg = onbekend).
+            self.conn.execute("ALTER TABLE results ADD COLUMN errors TEXT")
+
+    def lookup(self, file: str, schema: str, size: int, mtime_ns: int,
+               fingerprint: str):
+        """Geef het opgeslagen resultaat als `(type, status, details, errors)`, of None."""
+        return self.conn.execute(
+            "SELECT validation_type, status, details, errors FROM results "
+            "WHERE file = ? AND schema = ? AND size = ? AND mtime_ns = ? "
+            "AND fingerprint = ?",
+            (file, schema, size, mtime_ns, fingerprint)).fetchone()
+
+    def store(self, entries):
+        """Sla resultaten op; `entries` zijn tuples in kolomvolgorde."""
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            entries)
+        self.conn.commit()
+
+    def reuse(self, items, record):
+        """Geef eerdere resultaten door aan `record` en filter de werklijst.
+
+        `items` zijn werkeenheden `(pad, grootte, mtime_ns, indices)` uit
+        discovery.Discovery (of watch.Watcher). Validaties met een geldig opgeslagen resultaat
+        vallen weg; bestanden zonder resterende validaties verdwijnen helemaal.
+        Een opgeslagen invalid uit een lagere tier dan een validatie die opnieuw
+        moet, gaat mee terug naar de worker: die moet weten dat de latere tier
+        tegengehouden wordt (zie validate.validate_file).
+        Geeft `(resterende items, aantal hergebruikte resultaten)` terug.
+        """
+        remaining = []
+        reused = 0
+        for f, size, mtime, hits in items:
+            found = []
+            todo = []
+            for i in hits:
+                hit = None
+                if self.fingerprints[i] is not None:
+                    hit = self.lookup(str(f), self.schemas[i], size, mtime,
+                                      self.fingerprints[i])
+                if (hit is not None and self.structured_errors
+                        and hit[1] != "valid" and hit[3] is None):
+                    hit = None
+                if hit is None:
+                    todo.append(i)
+                    continue
+                row = {
+                    "file": str(f),
+                    "schema": Path(self.schemas[i]).name,
+                    "validation_type": hit[0],
+                    "status": hit[1],
+                    "details": hit[2]
+                }
+                if hit[3] is not None and self.structured_errors:
+                    row["errors"] = json.loads(hit[3])
+                found.append((i, row))
+            top = max((self.tiers[i] for i in todo
+                       if self.tiers[i] is not None), default=None)
+            if top is not None:
+                gates = [i for i, row in found if row["status"] == "invalid"
+                         and self.tiers[i] is not None and self.tiers[i] < top]
+                todo = sorted(todo + gates)
+                found = [(i, row) for i, row in found if i not in gates]
+            rows = [row for _, row in found]
+            if rows:
+                record(rows)
+                reused += len(rows)
+            if todo:
+                remaining.append((f, size, mtime, tuple(todo)))
+        return remaining, reused
+
+    def update(self, chunk, rows):
+        """Sla de resultaten van één verwerkte chunk op.
+
+        Errors worden niet opgeslagen (vaak tijdelijk, bv. een gestorven
+        Saxon-helper); die bestanden worden de volgende keer opnieuw gedaan.
+        Skipped-regels (fail-fast, upstream-invalid) ook niet: of die kloppen
+        hangt af van de andere validaties van het bestand.
+        """
+        files = {str(f): (size, mtime, hits) for f, size, mtime, hits in chunk}
+        entries = []
+        for row in rows:
+            meta = files.get(str(row["file"]))
+            if meta is None or row["status"] in ("error", "skipped"):
+                continue
+            size, mtime, hits = meta
+            matches = [i for i in hits
+                       if Path(self.schemas[i]).name == row["schema"]]
+            # Twee schema's met dezelfde naam op één bestand zijn niet uit
+            # elkaar te houden; dan liever opnieuw valideren.
+            if len(matches) != 1 or self.fingerprints[matches[0]] is None:
+                continue
+            i = matches[0]
+            entries.append((
+                str(row["file"]), self.schemas[i], size, mtime,
+                self.fingerprints[i], row["validation_type"], row["status"],
+                row["details"],
+                json.dumps(row["errors"]) if "errors" in row else None))
+        if entries:
+            self.store(entries)
+
+    def close(self):
+        self.conn.close()
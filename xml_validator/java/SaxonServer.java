@@ -0,0 +1,136 @@
+// src/xml_validator/java/SaxonServer.java
+//
+// Langlevende Saxon-helper voor Schematron-validatie (zie xml_validator/saxon.py).
+//
+// Protocol over stdin/stdout (UTF-8, één verzoek per regel):
+//
+//   verzoek:  <pad naar validator-xsl> TAB <pad naar xml-bestand> LF
+//        of:  DOC TAB <pad naar validator-xsl> TAB <systemId> TAB <aantal bytes> LF
+//             <XML-bytes>   (document dat de aanroeper al in het geheugen heeft)
+//   antwoord: OK <aantal bytes> LF <SVRL-bytes>
+//         of: ERR <melding op één regel> LF
+//
+// Bij het opstarten schrijft de helper "READY" LF. Gecompileerde stylesheets
+// worden per pad (+ lastModified) bewaard, zodat elke XSL maar één keer wordt
+// gecompileerd. Sluit de aanroeper stdin, dan stopt de helper vanzelf.
+
+import java.io.BufferedInputStream;
+import java.io.BufferedOutputStream;
+import java.io.ByteArrayInputStream;
+import java.io.ByteArrayOutputStream;
+import java.io.EOFException;
+import java.io.File;
+import java.io.FileDescriptor;
+import java.io.FileOutputStream;
+import java.io.IOException;
+import java.io.InputStream;
+import java.io.OutputStream;
+import java.nio.charset.StandardCharsets;
+import java.util.HashMap;
+import java.util.Map;
+
+import javax.xml.transform.stream.StreamSource;
+
+import net.sf.saxon.s9api.DocumentBuilder;
+import net.sf.saxon.s9api.Processor;
+import net.sf.saxon.s9api.Serializer;
+import net.sf.saxon.s9api.XdmNode;
+import net.sf.saxon.s9api.Xslt30Transformer;
+import net.sf.saxon.s9api.XsltCompiler;
+import net.sf.saxon.s9api.XsltExecutable;
+
+public class SaxonServer {
+
+    private final Processor processor = new Processor(false);
+    private final XsltCompiler compiler = processor.newXsltCompiler();
+    private final DocumentBuilder builder = processor.newDocumentBuilder();
+    private final Map<String, XsltExecutable> stylesheets = new HashMap<>();
+
+    public static void main(String[] args) throws Exception {
+        InputStream in = new BufferedInputStream(System.in);
+        OutputStream out = new BufferedOutputStream(new FileOutputStream(FileDescriptor.out));
+        // xsl:message en andere Saxon-uitvoer mogen het protocol niet verstoren.
+        System.setOut(System.err);
+
+        SaxonServer server = new SaxonServer();
+        out.write("READY\n".getBytes(StandardCharsets.UTF_8));
+        out.flush();
+
+        String line;
+        while ((line = readLine(in)) != null) {
+            if (line.isEmpty()) {
+                continue;
+            }
+            try {
+                byte[] svrl = server.handle(line, in);
+                out.write(("OK " + svrl.length + "\n").getBytes(StandardCharsets.UTF_8));
+                out.write(svrl);
+            } catch (Exception e) {
+                String msg = String.valueOf(e.getMessage()).replace('\n', ' ').replace('\r', ' ');
+                out.write(("ERR " + msg + "\n").getBytes(StandardCharsets.UTF_8));
+            }
+            out.flush();
+        }
+    }
+
+    private byte[] handle(String line, InputStream in) throws Exception {
+        String[] parts = line.split("\t");
+        Xslt30Transformer transformer;
+        XdmNode source;
+        if (parts.length == 4 && parts[0].equals("DOC")) {
+            // Eerst de bytes volledig lezen, zodat het protocol in sync blijft
+            // ook als compileren of parsen daarna faalt.
+            byte[] data = readBytes(in, Integer.parseInt(parts[3]));
+            transformer = stylesheet(new File(parts[1])).load30();
+            source = builder.build(new StreamSource(new ByteArrayInputStream(data), parts[2]));
+        } else if (parts.length == 2) {
+            transformer = stylesheet(new File(parts[0])).load30();
+            source = builder.build(new File(parts[1]));
+        } else {
+            throw new IllegalArgumentException("Invalid request: " + line);
+        }
+
+        ByteArrayOutputStream buffer = new ByteArrayOutputStream();
+        Serializer serializer = processor.newSerializer(buffer);
+        // Zelfde gedrag als net.sf.saxon.Transform -s: bron is ook het globale
+        // context-item.
+        transformer.setGlobalContextItem(source);
+        transformer.applyTemplates(source, serializer);
+        return buffer.toByteArray();
+    }
+
+    private XsltExecutable stylesheet(File xsl) throws Exception {
+        String key = xsl.getCanonicalPath() + "@" + xsl.lastModified();
+        XsltExecutable executable = stylesheets.get(key);
+        if (executable == null) {
+            executable = compiler.compile(new StreamSource(xsl));
+            stylesheets.put(key, executable);
+        }
+        return executable;
+    }
+
+    private static byte[] readBytes(InputStream in, int size) throws IOException {
+        byte[] data = new byte[size];
+        int offset = 0;
+        while (offset < size) {
+            int n = in.read(data, offset, size - offset);
+            if (n == -1) {
+                throw new EOFException("Unexpected end of input");
+            }
+            offset += n;
+        }
+        return data;
+    }
+
+    private static String readLine(InputStream in) throws IOException {
+        ByteArrayOutputStream line = new ByteArrayOutputStream();
+        int b;
+        while ((b = in.read()) != -1) {
+            if (b == '\n') {
+                return line.toString(StandardCharsets.UTF_8.name());
+            }
+            line.write(b);
+        }
+        return line.size() > 0 ? line.toString(StandardCharsets.UTF_8.name()) : null;
+    }
+}
@@ -0,0 +1,127 @@
+import json
+import os
+from collections import Counter
+from pathlib import Path
+
+# Bestandsnaam van het journaal van een run, naast de logs in de output-map.
+JOURNAL_NAME = "validation_journal_{run_id}.jsonl"
+
+# Instellingen die bij --resume gelijk moeten zijn aan die van de run. De
+# foutgrenzen horen erbij: ze bepalen de details (en bij fail-fast ook welke
+# validaties draaien) van de regels die al in het journaal staan.
+RESUME_KEYS = ("validations", "batches", "recursive",
+               "max_errors_per_file", "fail_fast")
+
+# Instellingen die de uitvoer bepalen; --resume neemt ze over uit de run.
+OUTPUT_KEYS = ("output_format", "timings", "dedup")
+
+
+def journal_path(output: Path, run_id: str) -> Path:
+    return Path(output) / JOURNAL_NAME.format(run_id=run_id)
+
+
+def _jsonable(row) -> dict:
+    return {key: str(value) if isinstance(value, Path) else value
+            for key, value in row.items()}
+
+
+class RunJournal:
+    """Append-only journaal (JSON Lines) met alle resultaten van een run.
+
+    De eerste regel is een header met de run-id en de instellingen; daarna
+    volgt per afgerond (bestand, schema) de volledige resultaatregel. Elke
+    `write` wordt direct geflusht, zodat na een kill of Ctrl-C alles wat al
+    binnen was bewaard blijft. Regels zonder bestand (meldingen per batch)
+    komen er niet in: die maakt de discovery bij --resume opnieuw. Alleen
+    vanuit het hoofdproces gebruiken.
+    """
+
+    def __init__(self, path: Path, header: dict):
+        self.path = path
+        new = not path.exists() or path.stat().st_size == 0
+        self.file = path.open("a", encoding="utf-8")
+        if new:
+            self.file.write(json.dumps(header, default=str) + "\n")
+            self.file.flush()
+
+    def write(self, rows):
+        lines = [json.dumps(_jsonable(row), ensure_ascii=False) + "\n"
+                 for row in rows if row.get("file")]
+        if lines:
+            self.file.writelines(lines)
+            self.file.flush()
+
+    def close(self, remove: bool = False):
+        if not self.file.closed:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.file.close()
+        if remove:
+            self.path.unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_journal(path: Path):
+    """Lees een journaal; geeft `(header, rows)`.
+
+    Een afgebroken laatste regel (kill tijdens het schrijven) wordt genegeerd
+    en uit het bestand geknipt, zodat het journaal daarna weer aangevuld kan
+    worden.
+    """
+    rows = []
+    header = None
+    good = 0
+    with path.open("rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                data = json.loads(line)
+            except ValueError:
+                break
+            good += len(line)
+            if header is None:
+                header = data
+            else:
+                rows.append(data)
+    if header is None:
+        raise ValueError(f"{path} is not a run journal")
+    if good < path.stat().st_size:
+        with path.open("r+b") as f:
+            f.truncate(good)
+    return header, rows
+
+
+class CompletedWork:
+    """Filter voor --resume: haal afgeronde (bestand, schema)-paren uit de werklijst.
+
+    Werkt op de stroom werkeenheden `(pad, grootte, mtime_ns, indices)`, net
+    als index.ResultIndex.reuse. Paren worden op bestandspad en schemanaam
+    herkend; staat hetzelfde schema twee keer op een bestand, dan telt elke
+    journaalregel voor één van beide.
+    """
+
+    def __init__(self, rows, validations):
+        self.names = [Path(v["schema"]).name for v in validations]
+        self.done = Counter((row["file"], row["schema"]) for row in rows)
+        self.skipped = 0
+
+    def filter(self, items):
+        remaining = []
+        for f, size, mtime, hits in items:
+            todo = []
+            for i in hits:
+                key = (str(f), self.names[i])
+                if self.done[key] > 0:
+                    self.done[key] -= 1
+                    self.skipped += 1
+                else:
+                    todo.append(i)
+            if todo:
+                remaining.append((f, size, mtime, tuple(todo)))
+        return remaining
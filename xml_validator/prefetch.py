@@ -0,0 +1,74 @@
+import queue
+import threading
+import time
+from pathlib import Path
+
+_DONE = object()
+
+
+class Prefetcher:
+    """Lees de bestanden van een chunk vooruit in een achtergrondthread.
+
+    Terwijl de worker het huidige bestand valideert, leest de thread de
+    volgende al in, zodat de wachttijd van trage opslag (NFS/SMB) wegvalt
+    achter het rekenwerk. Er staan hooguit `max_bytes` aan ingelezen maar nog
+    niet verwerkte bestanden in het geheugen (minstens één bestand). Items
+    waarvoor `skip(item)` True geeft (bv. streamend gevalideerde bestanden)
+    worden niet ingelezen.
+
+    Itereren levert `(item, data, wait)`: `data` is None als het bestand niet
+    is ingelezen (overgeslagen of leesfout, de validatie meldt die zelf) en
+    `wait` de tijd in seconden dat de worker op de thread moest wachten.
+    """
+
+    def __init__(self, items, max_bytes: int, skip=None):
+        self.items = items
+        self.max_bytes = max_bytes
+        self.skip = skip
+        self.queue = queue.Queue()
+        self.cond = threading.Condition()
+        self.in_flight = 0
+        self.stopped = False
+
+    def _read(self):
+        try:
+            for item in self.items:
+                if self.skip is not None and self.skip(item):
+                    self.queue.put((item, None, False))
+                    continue
+                with self.cond:
+                    while (self.in_flight and not self.stopped
+                           and self.in_flight + item[1] > self.max_bytes):
+                        self.cond.wait()
+                    if self.stopped:
+                        return
+                    self.in_flight += item[1]
+                try:
+                    data = Path(item[0]).read_bytes()
+                except OSError:
+                    data = None
+                self.queue.put((item, data, True))
+        finally:
+            self.queue.put(_DONE)
+
+    def __iter__(self):
+        thread = threading.Thread(target=self._read, daemon=True)
+        thread.start()
+        try:
+            while True:
+                start = time.perf_counter()
+                entry = self.queue.get()
+                wait = time.perf_counter() - start
+                if entry is _DONE:
+                    return
+                item, data, counted = entry
+                yield item, data, wait
+                if counted:
+                    with self.cond:
+                        self.in_flight -= item[1]
+                        self.cond.notify()
+        finally:
+            with self.cond:
+                self.stopped = True
+                self.cond.notify()
+            thread.join()
@@ -0,0 +1,64 @@
+from typing import NamedTuple
+
+# Statussen als codes: een record stuurt alleen de index mee.
+STATUSES = ("valid", "invalid", "error", "skipped")
+_STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+
+
+class Record(NamedTuple):
+    """Compacte resultaatregel van een worker naar het hoofdproces.
+
+    `pos` is de positie van het bestand in de chunk en `check` de validatie-
+    index; pad, schemanaam en validatietype kent het hoofdproces zelf al
+    (zie unpack_records). `status` is een index in STATUSES.
+    """
+    pos: int
+    check: int
+    status: int
+    details: str
+    errors: list | None = None
+    timings: dict | None = None
+
+
+def pack_rows(pos: int, idx, rows) -> list[Record]:
+    """Zet de regels van validate_file voor één bestand om naar Records.
+
+    `idx` zijn de validatie-indices in de volgorde van de checks die aan
+    validate_file gegeven zijn; elke regel komt als `(n, regel)` terug, met
+    `n` een positie in die lijst.
+    """
+    return [Record(pos, idx[n], _STATUS_CODES[row["status"]], row["details"],
+                   row.get("errors"), row.get("timings"))
+            for n, row in rows]
+
+
+def error_records(chunk, checks, details: str) -> list[Record]:
+    """Records met status error voor alle validaties van een chunk.
+
+    Voor een chunk zonder resultaat van zijn worker (zie cli.run_validations).
+    Validaties zonder bruikbaar schema krijgen geen regel, net als in
+    process_chunk.
+    """
+    return [Record(pos, i, _STATUS_CODES["error"], details)
+            for pos, (_, _, _, hits) in enumerate(chunk)
+            for i in hits if checks.get(i)]
+
+
+def unpack_records(chunk, records, checks) -> list[dict]:
+    """Bouw de volledige regels (dicts) in het hoofdproces weer op."""
+    rows = []
+    for record in records:
+        validation_type, _, schema_name = checks[record.check]
+        row = {
+            "file": chunk[record.pos][0],
+            "schema": schema_name,
+            "validation_type": "XSD" if validation_type == "XSD" else "Schematron",
+            "status": STATUSES[record.status],
+            "details": record.details
+        }
+        if record.errors is not None:
+            row["errors"] = record.errors
+        if record.timings is not None:
+            row["timings"] = record.timings
+        rows.append(row)
+    return rows
@@ -0,0 +1,221 @@
+import logging
+import os
+import subprocess
+import tempfile
+from pathlib import Path
+
+from . import config
+from .config import (SAXON_BATCH_DRIVER, SAXON_BATCH_SIZE,
+                     SAXON_SERVER_CLASSES, SAXON_SERVER_SOURCE)
+
+logger = logging.getLogger("xml_validator")
+
+# Hoe vaak een gestorven helper opnieuw gestart wordt voordat deze worker
+# definitief terugvalt op één Java-proces per bestand.
+MAX_RESTARTS = 3
+
+
+class SaxonServerError(RuntimeError):
+    """De Saxon-helper kon niet starten of is onderweg gestorven."""
+
+
+class SaxonServer:
+    """Langlevende Java-helper die Schematron-validators (XSL) één keer laadt.
+
+    Praat via stdin/stdout met `java/SaxonServer.java`; zie dat bestand voor
+    het protocol. Eén instantie per worker-proces (zie get_saxon_server).
+    """
+
+    def __init__(self, classpath: str | None = None):
+        self.classpath = config.classpath() if classpath is None else classpath
+        self.proc = None
+
+    def command(self) -> list[str]:
+        # Voorkeur: vooraf gecompileerde class (download_dependencies.py);
+        # anders de bron direct starten (Java >= 11 source-launch).
+        if (SAXON_SERVER_CLASSES / "SaxonServer.class").exists():
+            cp = os.pathsep.join(p for p in (self.classpath, str(SAXON_SERVER_CLASSES)) if p)
+            return ["java", "-cp", cp, "SaxonServer"]
+        return ["java", "-cp", self.classpath, str(SAXON_SERVER_SOURCE)]
+
+    def start(self):
+        self.close()
+        try:
+            self.proc = subprocess.Popen(
+                self.command(),
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        except OSError as e:
+            self.proc = None
+            raise SaxonServerError(f"Saxon-helper kon niet starten: {e}") from e
+
+        ready = self.proc.stdout.readline()
+        if ready.strip() != b"READY":
+            self.close()
+            raise SaxonServerError("Saxon-helper kon niet starten (geen READY ontvangen)")
+
+    def alive(self) -> bool:
+        return self.proc is not None and self.proc.poll() is None
+
+    def transform(self, xsl_path: Path, xml_path: Path,
+                  data: bytes | None = None) -> bytes:
+        """Voer de validator uit op één XML-bestand en geef de SVRL-bytes terug.
+
+        Met `data` gaat het reeds ingelezen document mee over de pipe en leest
+        Java het bestand niet opnieuw van schijf (`xml_path` is dan alleen de
+        systemId, voor foutmeldingen en relatieve verwijzingen).
+
+        Een fout in de transformatie zelf (bv. niet-welgevormde XML) komt terug
+        als RuntimeError; een gestorven helper als SaxonServerError.
+        """
+        if not self.alive():
+            raise SaxonServerError("Saxon-helper draait niet")
+        xsl, xml = Path(xsl_path).resolve(), Path(xml_path).resolve()
+        if data is None:
+            request = f"{xsl}\t{xml}\n".encode("utf-8")
+        else:
+            request = f"DOC\t{xsl}\t{xml.as_uri()}\t{len(data)}\n".encode("utf-8")
+        try:
+            self.proc.stdin.write(request)
+            if data is not None:
+                self.proc.stdin.write(data)
+            self.proc.stdin.flush()
+            header = self.proc.stdout.readline().decode("utf-8")
+            if header.startswith("OK "):
+                size = int(header[3:])
+                svrl = self.proc.stdout.read(size)
+                if len(svrl) == size:
+                    return svrl
+            elif header.startswith("ERR "):
+                raise RuntimeError(header[4:].strip())
+        except (OSError, ValueError) as e:
+            self.close()
+            raise SaxonServerError(f"Saxon-helper gestopt: {e}") from e
+        self.close()
+        raise SaxonServerError("Saxon-helper gestopt (onvolledig antwoord)")
+
+    def close(self):
+        if self.proc is None:
+            return
+        try:
+            self.proc.stdin.close()
+            self.proc.wait(timeout=5)
+        except Exception:
+            self.proc.kill()
+        self.proc = None
+
+
+_server = None
+_server_enabled = True
+_restarts = 0
+_batch_size = SAXON_BATCH_SIZE
+
+# Batch-rapporten bij voorkeur in RAM (tmpfs) i.p.v. een (netwerk-)/tmp.
+_BATCH_TMP = "/dev/shm" if os.access("/dev/shm", os.W_OK) else None
+
+
+def configure_saxon_server(enabled: bool):
+    """Zet server-modus aan/uit voor dit proces (worker-initializer)."""
+    global _server_enabled
+    _server_enabled = enabled
+    if not enabled:
+        close_saxon_server()
+
+
+def get_saxon_server():
+    """Geef de (gestarte) helper van dit proces terug, of None.
+
+    None betekent: server-modus staat uit of de helper is te vaak gestorven;
+    de aanroeper valt dan terug op één Java-proces per bestand.
+    """
+    global _server, _server_enabled, _restarts
+    if not _server_enabled:
+        return None
+    if _server is not None and _server.alive():
+        return _server
+    if _server is not None:
+        _restarts += 1
+        if _restarts > MAX_RESTARTS:
+            logger.warning("Saxon-helper blijft stoppen; terugval op één "
+                           "Java-proces per bestand.")
+            _server_enabled = False
+            return None
+    try:
+        _server = _server or SaxonServer()
+        _server.start()
+    except SaxonServerError as e:
+        logger.warning(f"{e}; terugval op één Java-proces per bestand.")
+        _server_enabled = False
+        _server = None
+    return _server
+
+
+def close_saxon_server():
+    global _server
+    if _server is not None:
+        _server.close()
+        _server = None
+
+
+def configure_saxon_batch(size: int | None):
+    """Stel in hoeveel bestanden er per Java-proces gaan zonder helper.
+
+    0, 1 of None schakelt de batch-modus uit (één Java-proces per bestand).
+    """
+    global _batch_size
+    _batch_size = int(size or 0)
+
+
+def saxon_batch_size() -> int:
+    return _batch_size
+
+
+def run_saxon_batch(xsl_path: Path, xml_paths, verbose: bool = False) -> dict:
+    """Voer een Schematron-validator uit op veel bestanden in één Java-proces.
+
+    Gebruikt de driver in xslt/batch.xsl; de rapporten komen in een tijdelijke
+    map, op Linux in /dev/shm (RAM). Geeft `{xml_path: svrl-bytes}` terug
+    voor de gelukte bestanden; mislukt de hele run of één bestand, dan
+    ontbreekt dat in het resultaat en doet de aanroeper het los opnieuw.
+    """
+    xml_paths = list(xml_paths)
+    with tempfile.TemporaryDirectory(prefix="xmlval-batch-", dir=_BATCH_TMP) as tmp:
+        tmp = Path(tmp)
+        listing = tmp / "files.txt"
+        listing.write_text(
+            "".join(Path(p).resolve().as_uri() + "\n" for p in xml_paths),
+            encoding="utf-8")
+        cmd = [
+            "java",
+            "-cp", config.classpath(),
+            "net.sf.saxon.Transform",
+            "-it",
+            f"-xsl:{SAXON_BATCH_DRIVER}",
+            f"stylesheet={Path(xsl_path).resolve().as_uri()}",
+            f"files={listing.as_uri()}",
+            f"out={tmp.as_uri()}/",
+        ]
+
+        if verbose:
+            print("-Running Java command:")
+            print("   " + " ".join(cmd))
+
+        try:
+            subprocess.run(cmd, check=True)
+        except (OSError, subprocess.CalledProcessError) as e:
+            logger.warning(f"Saxon-batch van {len(xml_paths)} bestanden mislukt "
+                           f"({e}); terugval op één Java-proces per bestand.")
+            return {}
+
+        results = {}
+        for n, xml_path in enumerate(xml_paths, 1):
+            try:
+                svrl = (tmp / f"{n}.svrl").read_bytes()
+            except OSError:
+                continue
+            if b"<batch-error" in svrl[:256]:
+                continue
+            results[xml_path] = svrl
+        return results
@@ -0,0 +1,171 @@
+import multiprocessing
+import sys
+from itertools import islice
+
+try:
+    import resource
+except ImportError:  # Windows: geen RSS-metingen, alleen de startschatting
+    resource = None
+
+from .config import MEMORY_FACTOR
+
+# Alleen chunks met een bestand van minstens deze grootte leren de geheugen-
+# factor bij; bij kleine bestanden overheerst de vaste ruis van de worker.
+MIN_OBSERVE_BYTES = 1024 * 1024
+
+_rss_baseline = None
+
+
+def windows(items, size: int):
+    """Knip een (luie) stroom werkeenheden in lijsten van hooguit `size`."""
+    it = iter(items)
+    while True:
+        window = list(islice(it, size))
+        if not window:
+            return
+        yield window
+
+
+def plan_chunks(items, workers: int, chunk_bytes: int, chunk_files: int):
+    """Groepeer werkeenheden tot chunks op basis van bestandsgrootte.
+
+    Bestanden worden van groot naar klein verdeeld; een chunk is vol bij
+    `chunk_bytes` bytes of `chunk_files` bestanden. De chunkgrootte wordt
+    verkleind zodat er minstens ~4 chunks per worker zijn. De chunks komen
+    grootste-eerst terug: de executor deelt ze uit via één gedeelde wachtrij,
+    zodat een vrije worker steeds het volgende stuk werk pakt (work stealing)
+    en één enorme batch niet meer op één core blijft hangen.
+    """
+    if not items:
+        return []
+    total = sum(item[1] for item in items)
+    target = max(1, min(chunk_bytes, total // (4 * max(1, workers)) or 1))
+    per_chunk = max(1, min(chunk_files, -(-len(items) // (4 * max(1, workers)))))
+
+    chunks = []
+    current, current_bytes = [], 0
+    for item in sorted(items, key=lambda it: it[1], reverse=True):
+        if current and (current_bytes + item[1] > target
+                        or len(current) >= per_chunk):
+            chunks.append((current_bytes, current))
+            current, current_bytes = [], 0
+        current.append(item)
+        current_bytes += item[1]
+    if current:
+        chunks.append((current_bytes, current))
+
+    chunks.sort(key=lambda c: c[0], reverse=True)
+    return [chunk for _, chunk in chunks]
+
+
+def peak_rss() -> int | None:
+    """Hoogste RSS van dit proces tot nu toe in bytes (None zonder `resource`)."""
+    if resource is None:
+        return None
+    # Linux rapporteert KB, macOS bytes.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def mark_rss_baseline():
+    """Leg het geheugen van een opgestarte worker vast (na het opwarmen)."""
+    global _rss_baseline
+    _rss_baseline = peak_rss()
+
+
+def rss_growth(before: int | None) -> int | None:
+    """Geheugen boven de baseline als de piek sinds `before` gestegen is.
+
+    Alleen dan weten we dat de piek in dit stuk werk lag; anders None.
+    """
+    after = peak_rss()
+    if before is None or after is None or _rss_baseline is None or after <= before:
+        return None
+    return after - _rss_baseline
+
+
+class MemoryBudget:
+    """Toelating van chunks op basis van een geschat geheugengebruik.
+
+    Een worker verwerkt de bestanden van een chunk na elkaar, dus een chunk
+    kost ongeveer zijn grootste (niet-streamende) bestand maal `factor`. De
+    factor begint op MEMORY_FACTOR en wordt bijgesteld met de gemeten pieken
+    van de workers (de hoogste waargenomen verhouding telt). Een chunk start
+    alleen als hij binnen `limit` past, of als er niets anders loopt: een
+    bestand dat in zijn eentje al te groot is, draait dan alleen. Met
+    `prefetch_bytes` telt ook de vooruit ingelezen data van de chunk mee.
+
+    Streamend gevalideerde bestanden tellen niet mee, tenzij één van hun
+    validaties in `tree_checks` staat (native Schematron): die bouwt de boom
+    ook boven de stream-drempel op.
+    """
+
+    def __init__(self, limit: int, stream_threshold: int | None = None,
+                 factor: float = MEMORY_FACTOR, prefetch_bytes: int = 0,
+                 tree_checks=()):
+        self.limit = limit
+        self.tree_checks = frozenset(tree_checks)
+        self.stream_threshold = stream_threshold
+        self.prefetch_bytes = prefetch_bytes
+        self.factor = factor
+        self.observed = False
+        self.in_use = 0
+
+    def largest(self, chunk) -> int:
+        # Streamend gevalideerde bestanden bouwen geen boom op (behalve voor
+        # een native Schematron).
+        return max((size for _, size, _, hits in chunk
+                    if self.stream_threshold is None
+                    or size < self.stream_threshold
+                    or not self.tree_checks.isdisjoint(hits)), default=0)
+
+    def estimate(self, chunk) -> int:
+        estimate = int(self.largest(chunk) * self.factor)
+        if self.prefetch_bytes:
+            estimate += min(self.prefetch_bytes, sum(item[1] for item in chunk))
+        return estimate
+
+    def fits(self, estimate: int) -> bool:
+        return self.in_use == 0 or self.in_use + estimate <= self.limit
+
+    def acquire(self, estimate: int):
+        self.in_use += estimate
+
+    def release(self, estimate: int):
+        self.in_use = max(0, self.in_use - estimate)
+
+    def observe(self, chunk, growth: int | None):
+        """Stel de factor bij met de gemeten geheugengroei van een chunk."""
+        largest = self.largest(chunk)
+        if growth is None or largest < MIN_OBSERVE_BYTES:
+            return
+        ratio = growth / largest
+        self.factor = ratio if not self.observed else max(self.factor, ratio)
+        self.observed = True
+
+
+class FailureCounter:
+    """Gedeelde teller van falende bestanden voor --fail-fast.
+
+    Het hoofdproces maakt de teller en geeft hem via init_worker aan elke
+    worker. Workers tellen per bestand mee en kijken vóór elk bestand of de
+    drempel `limit` al gehaald is; zo stopt de run na ongeveer `limit`
+    falende bestanden (plus hooguit één bestand per worker dat al liep) en
+    niet pas na de chunks die al onderweg waren.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.value = multiprocessing.Value("i", 0)
+
+    @property
+    def count(self) -> int:
+        return self.value.value
+
+    @property
+    def reached(self) -> bool:
+        return self.value.value >= self.limit
+
+    def add(self, n: int = 1):
+        with self.value.get_lock():
+            self.value.value += n
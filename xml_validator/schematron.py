@@ -1,29 +1,89 @@
+import hashlib
 import os
 import subprocess
 import tempfile
 from pathlib import Path
+from urllib.parse import urlparse
 
-from .config import CLASSPATH, SCHXSLT_TRANSPILER
+from lxml import etree
 
+from .config import (SAXON_VERSION, SCHXSLT_TRANSPILER,
+                     SCHXSLT_VERSION, classpath)
 
-def compile_schematron(sch_file: Path, verbose: bool = False) -> Path:
+# Verwijzingen naar andere bestanden in een Schematron (sch:include/extends en
+# ingesloten XSLT-includes/imports). Die tellen mee in de cache-sleutel.
+SCH_DEPENDENCY_XPATH = (
+    "//sch:include/@href | //sch:extends/@href"
+    " | //xsl:include/@href | //xsl:import/@href"
+)
+SCH_NS = {
+    "sch": "http://purl.oclc.org/dsdl/schematron",
+    "xsl": "http://www.w3.org/1999/XSL/Transform",
+}
+
+
+def schematron_dependencies(sch_file: Path) -> list[Path]:
+    """Geef de Schematron plus alle lokaal ingesloten bestanden terug."""
+    seen = []
+    todo = [Path(sch_file).resolve()]
+    while todo:
+        current = todo.pop()
+        if current in seen or not current.is_file():
+            continue
+        seen.append(current)
+        try:
+            tree = etree.parse(str(current))
+        except etree.XMLSyntaxError:
+            continue
+        for href in tree.xpath(SCH_DEPENDENCY_XPATH, namespaces=SCH_NS):
+            if urlparse(href).scheme in ("http", "https"):
+                continue
+            todo.append((current.parent / href.split("#")[0]).resolve())
+    return seen
+
+
+def schematron_fingerprint(sch_file: Path) -> str:
+    """Hash over de Schematron, zijn includes en de tooling-versies."""
+    h = hashlib.sha256()
+    h.update(f"schxslt={SCHXSLT_VERSION};saxon={SAXON_VERSION}".encode())
+    for dep in schematron_dependencies(sch_file):
+        h.update(dep.name.encode("utf-8") + b"\0")
+        h.update(dep.read_bytes())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def compile_schematron(sch_file: Path, verbose: bool = False,
+                       cache_dir: Path | None = None) -> Path:
     """
     Compile a .sch Schematron file into an XSLT3 validator using SchXslt2.
-    Returns path to the compiled XSL file (temp file).
+    Returns path to the compiled XSL file.
+
+    Without `cache_dir` this is a temp file the caller must remove. With a
+    `cache_dir` the result is stored under a content hash (see
+    schematron_fingerprint) and reused across runs; don't remove it.
     """
     if not SCHXSLT_TRANSPILER.exists():
         raise FileNotFoundError(f"SchXslt2 transpiler not found: {SCHXSLT_TRANSPILER}")
 
+    if cache_dir is not None:
+        cache_dir = Path(cache_dir)
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        cached = cache_dir / f"{Path(sch_file).stem}-{schematron_fingerprint(sch_file)}.xsl"
+        if cached.exists():
+            return cached
+
     # mkstemp opent het bestand en geeft een fd terug; die MOETEN we sluiten,
     # anders houdt Windows het bestand vergrendeld (WinError 32) zodra Saxon
     # ernaartoe wil schrijven of we het later willen verwijderen.
-    xsl_fd, xsl_name = tempfile.mkstemp(suffix=".xsl")
+    xsl_fd, xsl_name = tempfile.mkstemp(
+        suffix=".xsl", dir=cache_dir if cache_dir is not None else None)
     os.close(xsl_fd)
     compiled_xsl = Path(xsl_name)
 
     cmd = [
         "java",
-        "-cp", CLASSPATH,
+        "-cp", classpath(),
         "net.sf.saxon.Transform",
         f"-s:{sch_file}",
         f"-xsl:{SCHXSLT_TRANSPILER}",
@@ -34,6 +94,16 @@ def compile_schematron(sch_file: Path, verbose: bool = False) -> Path:
         print("-Running Java command:")
         print("   " + " ".join(cmd))
 
-    subprocess.run(cmd, check=True)
+    try:
+        subprocess.run(cmd, check=True)
+    except Exception:
+        compiled_xsl.unlink(missing_ok=True)
+        raise
+
+    if cache_dir is None:
+        return compiled_xsl
+
+    # Atomisch op zijn plek zetten: een half geschreven XSL is nooit zichtbaar.
+    os.replace(compiled_xsl, cached)
+    return cached
 
-    return compiled_xsl
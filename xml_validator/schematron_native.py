@@ -0,0 +1,469 @@
+import re
+from collections import OrderedDict
+from pathlib import Path
+
+from lxml import etree
+
+from .config import MAX_ERRORS_PER_FILE
+from .schematron import SCH_NS, schematron_dependencies
+from .writers import error_record
+
+SCH = SCH_NS["sch"]
+
+# Query bindings die lxml (XPath 1.0) zelf aankan; ISO Schematron zonder
+# queryBinding betekent XSLT 1.0.
+NATIVE_BINDINGS = {None, "xslt", "xslt1", "xslt1.0", "xpath", "xpath1"}
+
+# Functies die lxml bij het evalueren kent: de XPath 1.0-kernbibliotheek plus
+# de node-tests (en operatoren) die er in een expressie als aanroep uitzien.
+# Al het andere (XSLT-functies als current(), XPath 2-functies als matches())
+# compileert wel, maar faalt pas bij elke evaluatie met "Unregistered function".
+XPATH1_FUNCTIONS = frozenset("""
+    last position count id local-name namespace-uri name
+    string concat starts-with contains substring-before substring-after
+    substring string-length normalize-space translate
+    boolean not true false lang number sum floor ceiling round
+    node text comment processing-instruction and or div mod
+""".split())
+
+# EXSLT-functies die lxml ook buiten XSLT (in etree.XPath) kent, per namespace.
+EXSLT_FUNCTIONS = {
+    "http://exslt.org/regular-expressions": frozenset("test match replace".split()),
+    "http://exslt.org/strings": frozenset(
+        "concat padding align encode-uri decode-uri".split()),
+    "http://exslt.org/math": frozenset("""
+        min max highest lowest abs sqrt power log random
+        sin cos tan asin acos atan atan2 exp constant""".split()),
+    "http://exslt.org/sets": frozenset(
+        "difference intersection distinct has-same-node leading trailing".split()),
+    "http://exslt.org/dates-and-times": frozenset("""
+        date-time date time year leap-year month-in-year month-name
+        month-abbreviation week-in-year week-in-month day-in-year day-in-month
+        day-of-week-in-month day-in-week day-name day-abbreviation hour-in-day
+        minute-in-hour second-in-minute add add-duration difference duration
+        seconds sum""".split()),
+}
+
+_STRING_LITERAL = re.compile(r"'[^']*'|\"[^\"]*\"")
+_FUNCTION_CALL = re.compile(r"(?<![\w.:$-])(?:([\w.-]+):)?([\w.-]+)\s*\(")
+
+# Elementen waarvoor de native engine geen equivalent heeft.
+UNSUPPORTED_ELEMENTS = ("key", "function", "extends[@href]", "pattern[@is-a]",
+                        "pattern[@abstract='true']", "pattern[@documents]",
+                        "let[not(@value)]")
+
+# Aantal gecompileerde Schematron's dat één worker in het geheugen houdt.
+_CACHE_SIZE = 16
+_cache: "OrderedDict[tuple, NativeSchematron]" = OrderedDict()
+_deps: dict = {}
+_deps_key: dict = {}
+
+
+class UnsupportedSchematron(ValueError):
+    """De Schematron gebruikt iets wat de native engine niet kan (→ Saxon)."""
+
+
+def _split_top(expr: str, sep: str) -> list[str]:
+    """Splits op `sep` buiten haakjes, predicaten en strings."""
+    parts, depth, quote, start = [], 0, None, 0
+    for i, ch in enumerate(expr):
+        if quote:
+            if ch == quote:
+                quote = None
+        elif ch in "'\"":
+            quote = ch
+        elif ch in "([":
+            depth += 1
+        elif ch in ")]":
+            depth -= 1
+        elif ch == sep and depth == 0:
+            parts.append(expr[start:i])
+            start = i + 1
+    parts.append(expr[start:])
+    return parts
+
+
+def context_to_xpath(context: str) -> str:
+    """Zet een XSLT-matchpattern (rule/@context) om naar een XPath-expressie.
+
+    Elke tak van een unie zonder leidende `/` matcht overal in het document en
+    krijgt daarom `//` ervoor. Contexten op de documentknoop, attributen of
+    tekstknopen worden niet ondersteund: lxml kan daar geen XPath vanuit
+    evalueren.
+    """
+    branches = []
+    for branch in _split_top(context, "|"):
+        branch = branch.strip()
+        if not branch:
+            raise UnsupportedSchematron(f"lege context in {context!r}")
+        if branch == "/":
+            raise UnsupportedSchematron("context op de documentknoop")
+        last = _split_top(branch, "/")[-1].strip()
+        if (last.startswith(("@", "attribute::")) or last.startswith((
+                "text()", "comment()", "processing-instruction(", "node()"))):
+            raise UnsupportedSchematron(f"context op een niet-element: {branch!r}")
+        branches.append(branch if branch.startswith("/") else "//" + branch)
+    return " | ".join(branches)
+
+
+_XPATH_TOKEN = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<literal>"[^"]*"|'[^']*')
+  | (?P<number>\d+(?:\.\d*)?|\.\d+)
+  | (?P<var>\$[\w.-]+(?::[\w.-]+)?)
+  | (?P<name>[A-Za-z_][\w.-]*(?::(?:[A-Za-z_][\w.-]*|\*))?)
+  | (?P<op>//|/|\.\.|\.|::|!=|<=|>=|[()\[\],@|+=<>*-])
+""", re.X)
+
+# Node-types die er als functieaanroep uitzien maar een locatiestap zijn.
+_NODE_TYPES = {"node", "text", "comment", "processing-instruction"}
+
+# Functies die zonder argument de contextknoop gebruiken.
+_CONTEXT_FUNCTIONS = {"name", "local-name", "namespace-uri", "string",
+                      "string-length", "normalize-space", "number"}
+
+_OPERATOR_NAMES = {"and", "or", "div", "mod"}
+
+
+def document_context(expr: str) -> str:
+    """Herschrijf een expressie zodat ze geldt vanuit de documentknoop.
+
+    Een `sch:let` op schema- of patternniveau wordt in Schematron geëvalueerd
+    met het document als context, maar lxml neemt altijd het root-element.
+    Daarom krijgt elk relatief pad buiten een predicaat een `/` ervoor
+    (`count(alto/Page)` → `count(/alto/Page)`) en krijgen functies als
+    `name()` het document als argument. Binnen predicaten geldt een andere
+    context; die blijven ongemoeid.
+    """
+    tokens = []
+    pos = 0
+    while pos < len(expr):
+        m = _XPATH_TOKEN.match(expr, pos)
+        if m is None:
+            return expr  # laat _compile de syntaxfout melden
+        if m.lastgroup != "space":
+            tokens.append((m.lastgroup, m.group(), m.start()))
+        pos = m.end()
+
+    inserts = []          # posities waar "/" bij moet
+    stack = []            # open haakjes en predicaten
+    expect_operand = True
+    mid_path = False      # direct na / // @ ::
+    for n, (kind, value, start) in enumerate(tokens):
+        following = tokens[n + 1][1] if n + 1 < len(tokens) else None
+        outside = "[" not in stack
+        starts_path = expect_operand and not mid_path and outside
+        if kind == "name" and not expect_operand and value in _OPERATOR_NAMES:
+            expect_operand, mid_path = True, False
+            continue
+        if kind == "name":
+            if following == "(" and value not in _NODE_TYPES:
+                # Functieaanroep: zonder argumenten het document meegeven.
+                if (outside and value in _CONTEXT_FUNCTIONS
+                        and n + 2 < len(tokens) and tokens[n + 2][1] == ")"):
+                    inserts.append(tokens[n + 2][2])
+                expect_operand, mid_path = True, False
+                continue
+            if starts_path:
+                inserts.append(start)
+            expect_operand, mid_path = following in ("(", "::"), following == "::"
+            continue
+        if kind == "op" and value in (".", "..", "@") or (
+                kind == "op" and value == "*" and expect_operand):
+            if starts_path:
+                inserts.append(start)
+            expect_operand = mid_path = value == "@"
+            continue
+        if kind in ("literal", "number", "var"):
+            expect_operand = mid_path = False
+            continue
+        # Overige operatoren.
+        if value in ("(", "["):
+            stack.append(value)
+        elif value in (")", "]"):
+            if stack:
+                stack.pop()
+            expect_operand = mid_path = False
+            continue
+        expect_operand = True
+        mid_path = value in ("/", "//", "::")
+
+    for at in reversed(inserts):
+        expr = expr[:at] + "/" + expr[at:]
+    return expr
+
+
+def _check_functions(expr: str, namespaces: dict):
+    """Geef een UnsupportedSchematron bij een functie die lxml niet kent."""
+    for prefix, name in _FUNCTION_CALL.findall(_STRING_LITERAL.sub("''", expr)):
+        if prefix:
+            known = EXSLT_FUNCTIONS.get(namespaces.get(prefix), ())
+        else:
+            known = XPATH1_FUNCTIONS
+        if name not in known:
+            function = f"{prefix}:{name}" if prefix else name
+            raise UnsupportedSchematron(
+                f"functie {function}() niet in XPath 1.0: {expr!r}")
+
+
+def _compile(expr: str, namespaces: dict) -> etree.XPath:
+    _check_functions(expr, namespaces)
+    try:
+        return etree.XPath(expr, namespaces=namespaces)
+    except etree.XPathSyntaxError as e:
+        raise UnsupportedSchematron(f"geen XPath 1.0: {expr!r} ({e})") from e
+
+
+def _string(result) -> str:
+    """XPath string() van een evaluatieresultaat."""
+    if isinstance(result, list):
+        if not result:
+            return ""
+        first = result[0]
+        return first if isinstance(first, str) else first.xpath("string()")
+    if isinstance(result, bool):
+        return "true" if result else "false"
+    if isinstance(result, float):
+        if result != result:
+            return "NaN"
+        return str(int(result)) if result.is_integer() else repr(result)
+    return str(result)
+
+
+def _boolean(result) -> bool:
+    """XPath boolean() van een evaluatieresultaat."""
+    if isinstance(result, float):
+        return result == result and result != 0
+    return bool(result)
+
+
+def _location(node) -> str:
+    """Pad in dezelfde vorm als XPath 3 path() (zoals SchXslt2 rapporteert)."""
+    steps = []
+    while node is not None:
+        qname = etree.QName(node)
+        tag = node.tag
+        pos = 1
+        sibling = node.getprevious()
+        while sibling is not None:
+            if sibling.tag == tag:
+                pos += 1
+            sibling = sibling.getprevious()
+        steps.append(f"Q{{{qname.namespace or ''}}}{qname.localname}[{pos}]")
+        node = node.getparent()
+    return "/" + "/".join(reversed(steps))
+
+
+class _Check:
+    """Eén assert of report met zijn vooraf gecompileerde test en berichtdelen."""
+
+    def __init__(self, el, namespaces):
+        self.is_assert = etree.QName(el).localname == "assert"
+        self.id = el.get("id")
+        self.test = _compile(el.get("test"), namespaces)
+        # Bericht: tekst afgewisseld met sch:value-of/sch:name.
+        self.parts = []
+        if el.text:
+            self.parts.append(el.text)
+        for child in el:
+            if isinstance(child.tag, str) and child.tag == f"{{{SCH}}}value-of":
+                self.parts.append(_compile(child.get("select"), namespaces))
+            elif isinstance(child.tag, str) and child.tag == f"{{{SCH}}}name":
+                self.parts.append(_compile(child.get("path") or "name()", namespaces))
+            elif isinstance(child.tag, str):
+                self.parts.append(child.xpath("string()"))
+            if child.tail:
+                self.parts.append(child.tail)
+
+    def message(self, node, variables) -> str:
+        text = "".join(
+            part if isinstance(part, str) else _string(part(node, **variables))
+            for part in self.parts)
+        return " ".join(text.split())
+
+
+class _Rule:
+    def __init__(self, el, namespaces, abstract_rules):
+        context = el.get("context")
+        if not context:
+            raise UnsupportedSchematron("rule zonder context")
+        self.context = _compile(context_to_xpath(context), namespaces)
+        self.lets = []
+        self.checks = []
+        self._collect(el, namespaces, abstract_rules)
+
+    def _collect(self, el, namespaces, abstract_rules):
+        for child in el:
+            if not isinstance(child.tag, str):
+                continue
+            name = etree.QName(child).localname
+            if name == "let":
+                self.lets.append((child.get("name"),
+                                  _compile(child.get("value"), namespaces)))
+            elif name in ("assert", "report"):
+                self.checks.append(_Check(child, namespaces))
+            elif name == "extends":
+                base = abstract_rules.get(child.get("rule"))
+                if base is None:
+                    raise UnsupportedSchematron(
+                        f"abstracte rule {child.get('rule')!r} niet gevonden")
+                self._collect(base, namespaces, abstract_rules)
+
+
+class NativeSchematron:
+    """Schematron als voorgecompileerde lxml-XPath's (alleen XPath 1.0).
+
+    Volgt de Schematron-semantiek: per pattern wordt een knoop alleen door de
+    eerste rule met een passende context bekeken. `sch:let` (op schema-,
+    pattern- en rule-niveau), abstracte rules met `sch:extends`, `sch:include`
+    en `sch:value-of`/`sch:name` in meldingen worden ondersteund, met de
+    XPath 1.0-functies en de EXSLT-functies die lxml kent. Al het andere
+    (XPath 2+, XSLT-functies, abstracte patterns, phases, ...) geeft een
+    UnsupportedSchematron, zodat de aanroeper Saxon kan gebruiken.
+    """
+
+    def __init__(self, sch_file: Path):
+        root = _load(Path(sch_file))
+        if root.tag != f"{{{SCH}}}schema":
+            raise UnsupportedSchematron("geen ISO Schematron")
+        binding = root.get("queryBinding")
+        if (binding.lower() if binding else None) not in NATIVE_BINDINGS:
+            raise UnsupportedSchematron(f"queryBinding {binding!r}")
+        if root.get("defaultPhase") not in (None, "#ALL"):
+            raise UnsupportedSchematron("defaultPhase")
+        for name in UNSUPPORTED_ELEMENTS:
+            if root.xpath(f"//sch:{name}", namespaces=SCH_NS):
+                raise UnsupportedSchematron(f"sch:{name}")
+        if root.xpath("//xsl:*", namespaces=SCH_NS):
+            raise UnsupportedSchematron("ingesloten XSLT")
+
+        namespaces = {ns.get("prefix"): ns.get("uri")
+                      for ns in root.iterfind("sch:ns", SCH_NS)}
+        abstract_rules = {r.get("id"): r for r in root.iterfind(
+            ".//sch:rule[@abstract='true']", SCH_NS)}
+
+        # Lets op schema- en patternniveau gelden vanuit de documentknoop.
+        self.lets = [(let.get("name"),
+                      _compile(document_context(let.get("value")), namespaces))
+                     for let in root.iterfind("sch:let", SCH_NS)]
+        self.patterns = []
+        for pattern in root.iterfind("sch:pattern", SCH_NS):
+            lets = [(let.get("name"),
+                     _compile(document_context(let.get("value")), namespaces))
+                    for let in pattern.iterfind("sch:let", SCH_NS)]
+            rules = [_Rule(rule, namespaces, abstract_rules)
+                     for rule in pattern.iterfind("sch:rule", SCH_NS)
+                     if rule.get("abstract") != "true"]
+            self.patterns.append((lets, rules))
+
+    def validate(self, doc, limit: int = MAX_ERRORS_PER_FILE,
+                 errors: list | None = None, stop: bool = False):
+        """Valideer een geparste boom; geeft `(failed, details, total)`.
+
+        Zelfde vorm als validate.parse_svrl: aantal failed-asserts, details van
+        hooguit `limit` meldingen en het totaal aantal meldingen. Met een lijst
+        `errors` komen die meldingen daar ook gestructureerd in, hier met het
+        regelnummer van de context-knoop. Met `stop` (fail-fast) houdt de
+        validatie op bij de eerste failed-assert.
+        """
+        tree = doc if isinstance(doc, etree._ElementTree) else doc.getroottree()
+        variables = {}
+        for name, xpath in self.lets:
+            variables[name] = xpath(tree, **variables)
+
+        failed = total = 0
+        details = []
+        for lets, rules in self.patterns:
+            pattern_vars = dict(variables)
+            for name, xpath in lets:
+                pattern_vars[name] = xpath(tree, **pattern_vars)
+            fired = set()
+            for rule in rules:
+                nodes = rule.context(tree, **pattern_vars)
+                if not isinstance(nodes, list):
+                    continue
+                for node in nodes:
+                    if node in fired:
+                        continue
+                    fired.add(node)
+                    rule_vars = pattern_vars
+                    if rule.lets:
+                        rule_vars = dict(pattern_vars)
+                        for name, xpath in rule.lets:
+                            rule_vars[name] = xpath(node, **rule_vars)
+                    for check in rule.checks:
+                        hit = _boolean(check.test(node, **rule_vars))
+                        if hit == check.is_assert:
+                            continue
+                        total += 1
+                        failed += check.is_assert
+                        if len(details) < limit:
+                            location = _location(node)
+                            text = check.message(node, rule_vars)
+                            details.append(f"{location}: {text}" if check.is_assert
+                                           else f"[report] {location}: {text}")
+                            if errors is not None:
+                                errors.append(error_record(
+                                    "assert" if check.is_assert else "report",
+                                    text, line=node.sourceline,
+                                    domain="SCHEMATRON", location=location,
+                                    assert_id=check.id))
+                        if stop and failed:
+                            return failed, details, total
+        return failed, details, total
+
+
+def _load(sch_file: Path):
+    """Lees een Schematron in met alle sch:include's ingevoegd."""
+    root = etree.parse(str(sch_file)).getroot()
+    for include in root.xpath("//sch:include", namespaces=SCH_NS):
+        href = include.get("href")
+        target = (sch_file.parent / href.split("#")[0]).resolve()
+        included = _load(target)
+        fragment = href.partition("#")[2]
+        if fragment:
+            found = included.xpath("//*[@id = $id]", id=fragment)
+            if not found:
+                raise UnsupportedSchematron(f"include {href!r} niet gevonden")
+            included = found[0]
+        include.getparent().replace(include, included)
+    return root
+
+
+def _cache_key(sch_file: Path) -> tuple:
+    # Zoals validate._xsd_cache_key: de includes worden onthouden en per
+    # bestand kost de sleutel alleen een stat() per include. Verandert er een
+    # mtime, dan lezen we de includes opnieuw in.
+    deps = _deps.get(sch_file)
+    if deps is not None:
+        try:
+            key = (str(sch_file),) + tuple(
+                (str(d), d.stat().st_mtime_ns) for d in deps)
+        except OSError:
+            key = None
+        if key == _deps_key.get(sch_file):
+            return key
+    deps = schematron_dependencies(sch_file)
+    key = (str(sch_file),) + tuple((str(d), d.stat().st_mtime_ns) for d in deps)
+    _deps[sch_file] = deps
+    _deps_key[sch_file] = key
+    return key
+
+
+def compile_native(sch_file: Path) -> NativeSchematron:
+    """Geef een (gecachte) native Schematron voor dit proces terug.
+
+    De sleutel bevat de mtimes van de .sch en zijn includes, zodat een
+    gewijzigde Schematron opnieuw gecompileerd wordt.
+    """
+    sch_file = Path(sch_file)
+    key = _cache_key(sch_file)
+    compiled = _cache.get(key)
+    if compiled is not None:
+        _cache.move_to_end(key)
+        return compiled
+    compiled = NativeSchematron(sch_file)
+    _cache[key] = compiled
+    if len(_cache) > _CACHE_SIZE:
+        _cache.popitem(last=False)
+    return compiled
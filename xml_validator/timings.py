@@ -0,0 +1,99 @@
+import heapq
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+# Fasen per bestand (--timings). "read" en "parse" worden gedeeld door alle
+# validaties van een bestand en tellen mee bij de eerste daarvan.
+PHASES = ("read", "compile", "parse", "validate", "transform", "svrl")
+TIMING_FIELDS = [f"t_{p}_ms" for p in PHASES] + ["t_total_ms"]
+
+# Aantal traagste bestanden in de samenvatting.
+TOP_N = 10
+
+
+@contextmanager
+def phase(timings, name: str):
+    """Tel de duur van het blok op bij `timings[name]` (no-op als timings None)."""
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = timings.get(name, 0.0) + time.perf_counter() - start
+
+
+def timing_values(row) -> dict:
+    """Zet `row["timings"]` (seconden) om naar de timingvelden (ms, float).
+
+    Zonder timings zijn alle velden None.
+    """
+    timings = row.get("timings")
+    if not timings:
+        return dict.fromkeys(TIMING_FIELDS)
+    values = {f"t_{p}_ms": timings.get(p, 0.0) * 1000 for p in PHASES}
+    values["t_total_ms"] = sum(timings.values()) * 1000
+    return values
+
+
+def timing_columns(row) -> dict:
+    """Zet `row["timings"]` (seconden) om naar de extra CSV-kolommen (ms)."""
+    return {field: "" if value is None else f"{value:.3f}"
+            for field, value in timing_values(row).items()}
+
+
+def percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))]
+
+
+class TimingSummary:
+    """Verzamel fasetijden in het hoofdproces voor de samenvatting."""
+
+    def __init__(self, top_n: int = TOP_N):
+        self.top_n = top_n
+        self.run_phases = defaultdict(float)
+        self.phase_totals = defaultdict(lambda: defaultdict(float))
+        self.totals = defaultdict(list)
+        self.slowest = []
+
+    def add_run_phase(self, name: str, seconds: float):
+        self.run_phases[name] += seconds
+
+    def add(self, rows):
+        for row in rows:
+            timings = row.get("timings")
+            if not timings:
+                continue
+            total = sum(timings.values())
+            schema = row["schema"]
+            for p, seconds in timings.items():
+                self.phase_totals[schema][p] += seconds
+            self.totals[schema].append(total)
+            item = (total, str(row["file"]), schema)
+            if len(self.slowest) < self.top_n:
+                heapq.heappush(self.slowest, item)
+            else:
+                heapq.heappushpop(self.slowest, item)
+
+    def log(self, logger):
+        logger.info("\nTimings:")
+        for name, seconds in self.run_phases.items():
+            logger.info(f"  {name}: {seconds:.2f}s")
+        for schema, totals in sorted(self.totals.items()):
+            phases = ", ".join(
+                f"{p} {self.phase_totals[schema][p]:.2f}s" for p in PHASES
+                if self.phase_totals[schema].get(p))
+            logger.info(
+                f"  {schema}: {len(totals)} files, total {sum(totals):.2f}s "
+                f"(p50 {percentile(totals, 50) * 1000:.1f} ms, "
+                f"p95 {percentile(totals, 95) * 1000:.1f} ms, "
+                f"max {max(totals) * 1000:.1f} ms) — {phases}")
+        if self.slowest:
+            logger.info(f"  Slowest {len(self.slowest)} files:")
+            for total, file, schema in sorted(self.slowest, reverse=True):
+                logger.info(f"    {total * 1000:.1f} ms  {file} ({schema})")
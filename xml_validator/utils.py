@@ -3,19 +3,68 @@ import logging
 from logging.handlers import RotatingFileHandler
 from pathlib import Path
 
-import yaml
+from .timings import TIMING_FIELDS, timing_columns
+
+
+CSV_FIELDS = ["file", "schema", "validation_type", "status", "details"]
 
 
 def write_csv_log(rows, csv_log_filename: Path):
-    fieldnames = ["file", "schema", "validation_type", "status", "details"]
-    file_exists = csv_log_filename.exists() and csv_log_filename.stat().st_size > 0
+    with CsvLogWriter(csv_log_filename) as writer:
+        writer.write(rows)
+
+
+class CsvLogWriter:
+    """Schrijf resultaatregels gebufferd weg naar één CSV-bestand.
+
+    Regels worden in blokken van `buffer_rows` naar schijf geschreven en
+    geflusht, zodat het geheugen vlak blijft en een afgebroken run toch een
+    (gedeeltelijke) log achterlaat. Alleen vanuit het hoofdproces gebruiken.
 
-    with csv_log_filename.open("a", encoding="utf-8", newline="") as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames, delimiter=";")
+    Met `timings` komen de fasetijden uit `row["timings"]` als extra kolommen
+    mee (zie timings.TIMING_FIELDS); met `dedup` de kolom `duplicate_of` (het
+    bestand waarvan het resultaat is overgenomen, zie dedup.Deduplicator).
+    """
+
+    def __init__(self, path: Path, buffer_rows: int = 1000,
+                 timings: bool = False, dedup: bool = False):
+        self.path = path
+        self.buffer_rows = buffer_rows
+        self.buffer = []
+        self.timings = timings
+        fieldnames = (CSV_FIELDS + (["duplicate_of"] if dedup else [])
+                      + (TIMING_FIELDS if timings else []))
+        file_exists = path.exists() and path.stat().st_size > 0
+        self.file = path.open("a", encoding="utf-8", newline="")
+        self.writer = csv.DictWriter(self.file, fieldnames=fieldnames,
+                                     delimiter=";", extrasaction="ignore")
         if not file_exists:
-            writer.writeheader()
-        for row in rows:
-            writer.writerow(row)
+            self.writer.writeheader()
+
+    def write(self, rows):
+        self.buffer.extend(rows)
+        if len(self.buffer) >= self.buffer_rows:
+            self.flush()
+
+    def flush(self):
+        if self.timings:
+            self.writer.writerows({**row, **timing_columns(row)}
+                                  for row in self.buffer)
+        else:
+            self.writer.writerows(self.buffer)
+        self.buffer.clear()
+        self.file.flush()
+
+    def close(self):
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
 
 
 def setup_logging(
@@ -51,6 +100,27 @@ def load_config(path: str):
     """Load YAML config file if present, else return {}"""
     config_path = Path(path)
     if config_path.exists():
+        import yaml  # pas hier: `--version` hoeft PyYAML niet te laden
+
         with open(config_path, "r", encoding="utf-8") as f:
             return yaml.safe_load(f) or {}
     return {}
+
+
+_SIZE_UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+
+
+def parse_size(value):
+    """Zet een grootte als `16G`, `512M` of `1048576` om naar bytes.
+
+    None blijft None; een onbekende eenheid geeft een ValueError.
+    """
+    if value is None or isinstance(value, int):
+        return value
+    text = str(value).strip().upper().removesuffix("B")
+    unit = text[-1:] if text[-1:] in _SIZE_UNITS else ""
+    number = text[:len(text) - len(unit)].strip()
+    try:
+        return int(float(number) * _SIZE_UNITS[unit])
+    except ValueError:
+        raise ValueError(f"invalid size: {value!r}") from None
@@ -1,116 +1,788 @@
+import io
 import os
 import subprocess
-import tempfile
+import sys
+import time
+from collections import Counter, OrderedDict
+from itertools import islice
 from pathlib import Path
+from urllib.parse import urljoin
 
 from lxml import etree
 
-from .config import CLASSPATH, SVRL_NS
+from .catalog import CatalogResolver, is_remote, schema_locations
+from .config import (MAX_ERRORS_PER_FILE, STREAM_THRESHOLD,
+                     SVRL_NS, XSD_CACHE_SIZE, classpath)
+from .schematron_native import compile_native
+from .saxon import (SaxonServerError, get_saxon_server, run_saxon_batch,
+                    saxon_batch_size)
+from .timings import phase
+from .writers import error_record
+
+# Per-proces cache van gecompileerde XSD's. Elke worker compileert een schema
+# één keer en hergebruikt het voor alle bestanden; de sleutel bevat de mtimes
+# van alle includes/imports, zodat een gewijzigd schema opnieuw compileert.
+_xsd_cache: "OrderedDict[tuple, etree.XMLSchema]" = OrderedDict()
+_xsd_cache_size = XSD_CACHE_SIZE
+xsd_cache_stats = Counter()
+_xsd_deps: dict = {}
+_xsd_deps_key: dict = {}
+_stream_threshold = STREAM_THRESHOLD
+_structured_errors = False
+_max_errors = MAX_ERRORS_PER_FILE
+_fail_fast = False
+_catalog = None
+
+# Statussen waarna fail-fast de rest van een bestand overslaat.
+_FAILED = ("invalid", "error")
+
+_SVRL_FAILED = f"{{{SVRL_NS['svrl']}}}failed-assert"
+_SVRL_REPORT = f"{{{SVRL_NS['svrl']}}}successful-report"
+
+
+def configure_xsd_cache(size: int):
+    """Stel de maximale grootte van de XSD-cache in (minimaal 1)."""
+    global _xsd_cache_size
+    _xsd_cache_size = max(1, int(size))
+    while len(_xsd_cache) > _xsd_cache_size:
+        _xsd_cache.popitem(last=False)
+
+
+def configure_stream_threshold(size: int | None):
+    """Stel in vanaf welke bestandsgrootte XSD-validatie streamend gebeurt.
+
+    None schakelt streamen uit (altijd de hele boom opbouwen).
+    """
+    global _stream_threshold
+    _stream_threshold = None if size is None else int(size)
+
+
+def configure_structured_errors(enabled: bool):
+    """Geef regels ook `row["errors"]` mee (voor JSON Lines/Parquet-output).
+
+    Standaard uit: de CSV gebruikt alleen `details` en zo gaan er geen extra
+    dicts van de workers naar het hoofdproces.
+    """
+    global _structured_errors
+    _structured_errors = bool(enabled)
+
+
+def configure_error_limits(max_errors: int | None = MAX_ERRORS_PER_FILE,
+                           fail_fast: bool = False):
+    """Stel het aantal meldingen per validatie in en zet fail-fast aan/uit.
+
+    None = geen grens. Met fail-fast stopt een bestand bij de eerste fout: één
+    melding per validatie, streamende XSD-validatie, SVRL-verwerking en de
+    native Schematron breken af en de overige validaties van het bestand
+    worden overgeslagen (zie validate_file).
+    """
+    global _max_errors, _fail_fast
+    _max_errors = sys.maxsize if max_errors is None else max(1, int(max_errors))
+    _fail_fast = bool(fail_fast)
+
+
+def configure_catalog(catalog):
+    """Laat XSD-imports via een SchemaCatalog van schijf lezen (None = uit).
+
+    Remote imports die de catalogus kent, worden dan niet meer gedownload en
+    de lokale kopieën tellen mee in de cache-sleutel.
+    """
+    global _catalog
+    _catalog = catalog or None
+    _xsd_deps.clear()
+    _xsd_deps_key.clear()
+
+
+def _xsd_parser() -> etree.XMLParser:
+    parser = etree.XMLParser()
+    if _catalog is not None:
+        parser.resolvers.add(CatalogResolver(_catalog))
+    return parser
+
+
+def _limit() -> int:
+    return 1 if _fail_fast else _max_errors
+
+
+def _join_details(messages: list[str], total: int) -> str:
+    if total > len(messages):
+        messages = messages + [f"... ({total - len(messages)} more)"]
+    return "; ".join(messages)
+
+
+def xsd_dependencies(schema_path: Path) -> list[Path]:
+    """Geef het schema plus alle lokaal bereikbare includes/imports terug.
+
+    Remote `schemaLocation`s (http/https) worden alleen gevolgd als de
+    catalogus (zie configure_catalog) ze naar een lokaal bestand vertaalt;
+    relatieve imports daarin gelden t.o.v. de oorspronkelijke URL.
+    """
+    seen = []
+    todo = [(Path(schema_path).resolve(), None)]
+    while todo:
+        current, url = todo.pop()
+        if current in seen or not current.is_file():
+            continue
+        seen.append(current)
+        try:
+            tree = etree.parse(str(current))
+        except etree.XMLSyntaxError:
+            continue
+        for loc in schema_locations(tree):
+            if url is not None:
+                loc = urljoin(url, loc)
+            if is_remote(loc):
+                local = _catalog.lookup(loc) if _catalog is not None else None
+                if local is not None:
+                    todo.append((local.resolve(), loc))
+                continue
+            todo.append(((current.parent / loc).resolve(), None))
+    return seen
+
+
+def _xsd_cache_key(schema_path: Path) -> tuple:
+    # De lijst met afhankelijkheden wordt onthouden; per lookup kost de sleutel
+    # alleen een stat() per bestand. Verandert er een mtime, dan lezen we de
+    # includes opnieuw in (er kan een import bijgekomen zijn).
+    deps = _xsd_deps.get(schema_path)
+    if deps is not None:
+        try:
+            key = (str(schema_path),) + tuple(
+                (str(d), d.stat().st_mtime_ns) for d in deps)
+        except OSError:
+            key = None
+        if key == _xsd_deps_key.get(schema_path):
+            return key
+    deps = xsd_dependencies(schema_path)
+    key = (str(schema_path),) + tuple(
+        (str(d), d.stat().st_mtime_ns) for d in deps)
+    _xsd_deps[schema_path] = deps
+    _xsd_deps_key[schema_path] = key
+    return key
+
+
+def get_xsd_schema(schema_path: Path) -> etree.XMLSchema:
+    """Geef een gecompileerd XSD-schema terug uit de per-proces LRU-cache."""
+    key = _xsd_cache_key(schema_path)
+    xsd = _xsd_cache.get(key)
+    if xsd is not None:
+        _xsd_cache.move_to_end(key)
+        xsd_cache_stats["hits"] += 1
+        return xsd
+
+    xsd_cache_stats["misses"] += 1
+    with open(schema_path, "rb") as f:
+        xsd = etree.XMLSchema(etree.parse(f, _xsd_parser()))
+    _xsd_cache[key] = xsd
+    if len(_xsd_cache) > _xsd_cache_size:
+        _xsd_cache.popitem(last=False)
+    return xsd
+
+
+def warm_xsd_cache(schema_paths):
+    """Compileer de opgegeven XSD's vooraf (bv. als worker-initializer).
+
+    Fouten worden hier genegeerd; die komen per bestand netjes terug via
+    validate_single_xsd. Opwarmen telt niet mee in de hit/miss-statistiek.
+    """
+    for schema_path in schema_paths:
+        try:
+            get_xsd_schema(Path(schema_path))
+        except Exception:
+            pass
+    xsd_cache_stats.clear()
+
+
+class _NullTarget:
+    """Parser-target dat niets opbouwt; alleen de schema-validatie telt."""
+
+    def close(self):
+        return None
+
+
+class _StopAtError(Exception):
+    """Streamend valideren afgebroken bij de eerste fout (fail-fast)."""
+
+
+class _FailFastTarget(_NullTarget):
+    """Als _NullTarget, maar breekt het parsen af na de eerste schemafout."""
+
+    def __init__(self):
+        self.parser = None
+
+    def start(self, tag, attrib):
+        if self.parser.error_log.filter_from_errors():
+            raise _StopAtError()
+
+
+def _stream_validate(xmlfile: Path, xsd: etree.XMLSchema, stop: bool = False):
+    """Valideer tijdens het parsen, zonder boom in het geheugen.
+
+    libxml2 valideert de SAX-events direct tegen het schema; het geheugen
+    blijft gelijk, hoe groot het bestand ook is. Well-formedness-fouten geven
+    een XMLSyntaxError, schemafouten komen in de error_log van de parser. Met
+    `stop` (fail-fast) houdt het parsen op bij de eerste schemafout.
+    """
+    target = _FailFastTarget() if stop else _NullTarget()
+    parser = etree.XMLParser(schema=xsd, target=target)
+    if stop:
+        target.parser = parser
+    try:
+        etree.parse(str(xmlfile), parser)
+    except _StopAtError:
+        pass
+    except etree.XMLSyntaxError:
+        # Met een schema meldt lxml bij een niet-welgevormd bestand soms de
+        # eerste schemafout (zonder regelnummer) i.p.v. de parsefout. Een
+        # doorloop zonder schema (ook zonder boom) geeft de echte fout met zijn
+        # positie; is het bestand toch welgevormd, dan blijft het een schemafout.
+        _check_wellformed(xmlfile)
+        if not parser.error_log.filter_from_errors():
+            raise
+    return parser.error_log.filter_from_errors()
+
+
+def _format_xsd_errors(error_log, limit: int) -> str:
+    # Bij streamend valideren kent libxml2 geen regelnummers (line 0).
+    return _join_details([
+        (f"Line {e.line}: " if e.line else "")
+        + f"{e.message} (domain: {e.domain_name})"
+        for e in islice(error_log, limit)
+    ], len(error_log))
+
+
+def _xsd_error_records(error_log, limit: int) -> list[dict]:
+    return [error_record("error", e.message, e.line, e.column, e.domain_name,
+                         getattr(e, "path", None))
+            for e in islice(error_log, limit)]
+
+
+def _exception_records(e: Exception, domain: str | None = None) -> list[dict]:
+    """Een exception als gestructureerde melding (met positie als die er is)."""
+    if isinstance(e, etree.XMLSyntaxError):
+        line, column = e.position
+        return [error_record("error", e.msg or str(e), line, column, "PARSER")]
+    return [error_record("error", str(e), domain=domain)]
 
 
 def validate_single_xsd(
         xmlfile: Path,
         schema_path: Path,
         schema_name: str,
-        verbose: bool = False) -> dict:
-    """Valideer één XML-bestand tegen een XSD-schema."""
+        verbose: bool = False,
+        doc=None,
+        timings: dict | None = None,
+        stream: bool = False) -> dict:
+    """Valideer één XML-bestand tegen een XSD-schema.
+
+    Met `doc` wordt een al geparste boom gebruikt i.p.v. het bestand opnieuw te
+    lezen (zie validate_file). Met `stream` wordt gevalideerd tijdens het
+    parsen zonder boom op te bouwen (voor zeer grote bestanden; parse- en
+    validatietijd vallen dan samen onder "validate"). Met een `timings`-dict
+    worden de fasetijden (compile/parse/validate, in seconden) bijgehouden en
+    als `row["timings"]` meegegeven.
+
+    Fail-fast breekt alleen de streamende validatie af bij de eerste fout;
+    xsd.validate op een boom loopt altijd door en bouwt de volledige error_log
+    op (lxml kent geen vroege stop), alleen de uitvoer wordt begrensd.
+    """
     try:
-        with open(schema_path, "rb") as f:
-            xsd = etree.XMLSchema(etree.parse(f))
+        with phase(timings, "compile"):
+            xsd = get_xsd_schema(schema_path)
 
-        doc = etree.parse(xmlfile)
-        valid = xsd.validate(doc)
+        if stream:
+            with phase(timings, "validate"):
+                errors = _stream_validate(xmlfile, xsd, stop=_fail_fast)
+            valid = not errors
+        else:
+            if doc is None:
+                with phase(timings, "parse"):
+                    doc = etree.parse(xmlfile)
+            with phase(timings, "validate"):
+                valid = xsd.validate(doc)
+            errors = xsd.error_log
 
         if valid:
-            return {
-                "file": xmlfile.resolve(),
+            row = {
+                "file": xmlfile,
                 "schema": schema_name,
                 "validation_type": "XSD",
                 "status": "valid",
                 "details": ""
             }
         else:
-            details = "; ".join(
-                f"Line {e.line}: {e.message} (domain: {e.domain_name})"
-                for e in xsd.error_log
-            )
-            return {
-                "file": xmlfile.resolve(),
+            details = _format_xsd_errors(errors, _limit())
+            row = {
+                "file": xmlfile,
                 "schema": schema_name,
                 "validation_type": "XSD",
                 "status": "invalid",
                 "details": details
             }
+            if _structured_errors:
+                row["errors"] = _xsd_error_records(errors, _limit())
     except Exception as e:
-        return {
-            "file": xmlfile.resolve(),
+        row = {
+            "file": xmlfile,
             "schema": schema_name,
             "validation_type": "XSD",
             "status": "error",
             "details": str(e)
         }
+        if _structured_errors:
+            row["errors"] = _exception_records(e)
+    if timings is not None:
+        row["timings"] = timings
+    return row
+
+
+def _run_saxon(xmlfile: Path, schema_path: Path, verbose: bool) -> bytes:
+    """Eén Java-proces per bestand; geeft de SVRL-bytes terug.
+
+    Saxon schrijft het rapport naar stdout (geen -o), zodat er per validatie
+    geen temp-bestand aangemaakt, gelezen en opgeruimd hoeft te worden.
+    """
+    cmd = [
+        "java",
+        "-cp", classpath(),
+        "net.sf.saxon.Transform",
+        f"-s:{xmlfile}",
+        f"-xsl:{schema_path}",
+    ]
+
+    if verbose:
+        print("-Running Java command:")
+        print("   " + " ".join(cmd))
+
+    return subprocess.run(cmd, check=True, stdout=subprocess.PIPE).stdout
+
+
+def _transform_svrl(xmlfile: Path, schema_path: Path, verbose: bool,
+                    data: bytes | None = None) -> bytes:
+    # Eerst de langlevende helper van deze worker; sterft die, dan één herstart
+    # en daarna terugval op het oude pad met één Java-proces per bestand (dat
+    # leest het bestand zelf weer van schijf).
+    for _ in range(2):
+        server = get_saxon_server()
+        if server is None:
+            break
+        try:
+            return server.transform(schema_path, xmlfile, data)
+        except SaxonServerError:
+            continue
+    return _run_saxon(xmlfile, schema_path, verbose)
+
+
+def parse_svrl(svrl: bytes, limit: int = MAX_ERRORS_PER_FILE,
+               errors: list | None = None, stop: bool = False):
+    """Haal failed-asserts en successful-reports incrementeel uit een SVRL-rapport.
+
+    Geeft `(failed, details, total)`: het aantal failed-asserts, de details van
+    hooguit `limit` meldingen en het totaal aantal meldingen. Met een lijst
+    `errors` komen dezelfde meldingen daar ook gestructureerd in (zie
+    writers.error_record). Met `stop` (fail-fast) houdt het lezen op bij de
+    eerste failed-assert. Verwerkte elementen worden direct opgeruimd, zodat
+    ook een rapport met honderdduizenden meldingen weinig geheugen kost.
+    """
+    failed = 0
+    total = 0
+    details = []
+    for _, el in etree.iterparse(io.BytesIO(svrl), events=("end",)):
+        if el.tag == _SVRL_FAILED or el.tag == _SVRL_REPORT:
+            total += 1
+            is_failed = el.tag == _SVRL_FAILED
+            failed += is_failed
+            if len(details) < limit:
+                text = el.findtext("svrl:text", namespaces=SVRL_NS)
+                location = el.attrib.get("location", "unknown")
+                details.append(f"{location}: {text}" if is_failed
+                               else f"[report] {location}: {text}")
+                if errors is not None:
+                    errors.append(error_record(
+                        "assert" if is_failed else "report", text,
+                        domain="SCHEMATRON", location=el.attrib.get("location"),
+                        assert_id=el.attrib.get("id")))
+            if stop and failed:
+                break
+        parent = el.getparent()
+        if parent is not None and parent.getparent() is None:
+            # Kind van de root is afgehandeld: weg ermee.
+            el.clear()
+            while el.getprevious() is not None:
+                del parent[0]
+    return failed, details, total
 
 
 def validate_single_sch(
         xmlfile: Path,
         schema_path: Path,
         schema_name: str,
-        verbose: bool = False) -> dict:
+        verbose: bool = False,
+        data: bytes | None = None,
+        timings: dict | None = None,
+        svrl: bytes | None = None) -> dict:
     """Valideer één XML-bestand tegen een Schematron (gecompileerd naar XSLT).
 
-    Schrijft het SVRL-rapport naar een UNIEK temp-bestand per aanroep, zodat
-    parallel draaiende validaties elkaars rapport niet overschrijven.
+    Gebruikt de Saxon-helper van deze worker als die beschikbaar is (zie
+    saxon.py), anders één Java-proces per bestand. Met `data` krijgt de helper
+    de al ingelezen bytes mee i.p.v. het bestand opnieuw te lezen; met `svrl`
+    is het rapport al gemaakt (zie prefetch_svrl). Met een `timings`-dict
+    worden transform/svrl-tijden bijgehouden (zie validate_single_xsd).
     """
-    svrl_fd, svrl_name = tempfile.mkstemp(suffix=".svrl.xml")
-    os.close(svrl_fd)
-    svrl_temp = Path(svrl_name)
+    errors = [] if _structured_errors else None
     try:
-        cmd = [
-            "java",
-            "-cp", CLASSPATH,
-            "net.sf.saxon.Transform",
-            f"-s:{xmlfile}",
-            f"-xsl:{schema_path}",
-            f"-o:{svrl_temp}"
-        ]
+        if svrl is None:
+            with phase(timings, "transform"):
+                svrl = _transform_svrl(xmlfile, schema_path, verbose, data)
+        with phase(timings, "svrl"):
+            failed, messages, total = parse_svrl(svrl, _limit(), errors,
+                                                 stop=_fail_fast)
+        details = _join_details(messages, total)
 
-        if verbose:
-            print("-Running Java command:")
-            print("   " + " ".join(cmd))
+        if failed:
+            row = {
+                "file": xmlfile,
+                "schema": schema_name,
+                "validation_type": "Schematron",
+                "status": "invalid",
+                "details": details
+            }
+        else:
+            row = {
+                "file": xmlfile,
+                "schema": schema_name,
+                "validation_type": "Schematron",
+                "status": "valid",
+                "details": details
+            }
+    except Exception as e:
+        row = {
+            "file": xmlfile,
+            "schema": schema_name,
+            "validation_type": "Schematron",
+            "status": "error",
+            "details": f"Saxon failed: {e}"
+        }
+        if errors is not None:
+            errors = _exception_records(e, "SAXON")
+    if errors:
+        row["errors"] = errors
+    if timings is not None:
+        row["timings"] = timings
+    return row
 
-        subprocess.run(cmd, check=True)
 
-        tree = etree.parse(str(svrl_temp))
-        failed = tree.xpath("//svrl:failed-assert", namespaces=SVRL_NS)
+def validate_single_sch_native(
+        xmlfile: Path,
+        schema_path: Path,
+        schema_name: str,
+        verbose: bool = False,
+        doc=None,
+        timings: dict | None = None) -> dict:
+    """Valideer één XML-bestand met de native Schematron-engine (zonder Java).
+
+    `schema_path` is de .sch zelf; die wordt per worker één keer naar lxml-
+    XPath's gecompileerd (zie schematron_native). Met `doc` wordt de al
+    geparste boom gebruikt. De regel heeft dezelfde vorm als bij
+    validate_single_sch.
+    """
+    errors = [] if _structured_errors else None
+    try:
+        with phase(timings, "compile"):
+            schematron = compile_native(schema_path)
+        if doc is None:
+            with phase(timings, "parse"):
+                doc = etree.parse(xmlfile)
+        with phase(timings, "validate"):
+            failed, messages, total = schematron.validate(
+                doc, _limit(), errors, stop=_fail_fast)
+        details = _join_details(messages, total)
 
         if failed:
-            details = "; ".join(
-                f"{fa.attrib.get('location', 'unknown')}: "
-                f"{fa.findtext('svrl:text', namespaces=SVRL_NS)}"
-                for fa in failed
-            )
-            return {
-                "file": xmlfile.resolve(),
+            row = {
+                "file": xmlfile,
                 "schema": schema_name,
                 "validation_type": "Schematron",
                 "status": "invalid",
                 "details": details
             }
         else:
-            return {
-                "file": xmlfile.resolve(),
+            row = {
+                "file": xmlfile,
                 "schema": schema_name,
                 "validation_type": "Schematron",
                 "status": "valid",
-                "details": ""
+                "details": details
             }
     except Exception as e:
-        return {
-            "file": xmlfile.resolve(),
+        row = {
+            "file": xmlfile,
             "schema": schema_name,
             "validation_type": "Schematron",
             "status": "error",
-            "details": f"Saxon failed: {e}"
+            "details": str(e)
         }
-    finally:
-        svrl_temp.unlink(missing_ok=True)
+        if errors is not None:
+            errors = _exception_records(e)
+    if errors:
+        row["errors"] = errors
+    if timings is not None:
+        row["timings"] = timings
+    return row
+
+
+def prefetch_svrl(jobs, verbose: bool = False) -> dict:
+    """Maak SVRL-rapporten voor een hele chunk als er geen Saxon-helper is.
+
+    `jobs` is een lijst `(xmlfile, checks)` zoals voor validate_file. Per
+    gecompileerde validator gaan de bestanden in groepen van saxon_batch_size
+    naar één Java-proces (saxon.run_saxon_batch). Geeft
+    `{(xmlfile, schema_path): (svrl, seconden)}` terug, met per bestand een
+    gelijk deel van de batchtijd. Bestanden zonder resultaat gaan daarna
+    gewoon los via validate_single_sch.
+    """
+    size = saxon_batch_size()
+    if size < 2:
+        return {}
+
+    by_xsl = {}
+    for xmlfile, checks in jobs:
+        for validation_type, schema_path, _ in checks:
+            if validation_type == "Schematron":
+                by_xsl.setdefault(schema_path, []).append(xmlfile)
+    # Geen Saxon-Schematron in deze chunk: dan ook geen helper starten.
+    if not by_xsl or not saxon_batching():
+        return {}
+
+    results = {}
+    for schema_path, files in by_xsl.items():
+        for start in range(0, len(files), size):
+            group = files[start:start + size]
+            if len(group) < 2:
+                continue
+            started = time.perf_counter()
+            svrls = run_saxon_batch(schema_path, group, verbose)
+            share = (time.perf_counter() - started) / len(group)
+            for xmlfile, svrl in svrls.items():
+                results[(xmlfile, schema_path)] = (svrl, share)
+    return results
+
+
+def streams(size: int) -> bool:
+    """Valideert dit proces een bestand van `size` bytes streamend?"""
+    return _stream_threshold is not None and size >= _stream_threshold
+
+
+def saxon_batching() -> bool:
+    """Gaat Saxon-Schematron in dit proces per chunk in batches (zonder helper)?"""
+    return saxon_batch_size() >= 2 and get_saxon_server() is None
+
+
+def blocking(tier: int | None, failures) -> list[str]:
+    """Namen van gefaalde schema's uit een lagere tier dan `tier`.
+
+    `failures` is een lijst `(tier, schemanaam)` van invalid/error-regels van
+    hetzelfde bestand; validaties zonder tier houden niets tegen en worden
+    niet tegengehouden.
+    """
+    if tier is None:
+        return []
+    return [name for t, name in failures if t is not None and t < tier]
+
+
+def _check_wellformed(xmlfile: Path, data: bytes | None = None):
+    """Parse zonder boom op te bouwen; XMLSyntaxError als het niet welgevormd is."""
+    parser = etree.XMLParser(target=_NullTarget())
+    if data is not None:
+        etree.fromstring(data, parser)
+    else:
+        etree.parse(str(xmlfile), parser)
+
+
+def _error_row(xmlfile: Path, validation_type: str, schema_name: str,
+               error: Exception, timings: bool) -> dict:
+    """Error-regel voor een bestand dat niet te parsen is."""
+    row = {
+        "file": xmlfile,
+        "schema": schema_name,
+        "validation_type": ("XSD" if validation_type == "XSD"
+                            else "Schematron"),
+        "status": "error",
+        "details": str(error)
+    }
+    if _structured_errors:
+        row["errors"] = _exception_records(error)
+    if timings:
+        row["timings"] = {}
+    return row
+
+
+# Volgorde binnen een tier: goedkoop eerst.
+_CHECK_ORDER = {"XSD": 0, "SchematronNative": 1, "Schematron": 2}
+
+
+def validate_file(xmlfile: Path, checks, verbose: bool = False,
+                  timings: bool = False, svrl: dict | None = None,
+                  data: bytes | None = None, tiers=None,
+                  upstream=None) -> list[tuple[int, dict]]:
+    """Voer alle validaties voor één bestand uit op één keer inlezen/parsen.
+
+    `checks` is een lijst `(validation_type, schema_path, schema_name)` met
+    validation_type "XSD", "SchematronNative" (schema_path is de .sch) of
+    "Schematron" (schema_path is de gecompileerde XSL). Alle XSD's en native
+    Schematron's gebruiken dezelfde geparste boom; Saxon krijgt de al
+    ingelezen bytes mee als de helper draait, of gebruikt het rapport uit
+    `svrl` als prefetch_svrl het al in een batch gemaakt heeft.
+
+    Met `data` is het bestand al ingelezen (zie prefetch.Prefetcher) en wordt
+    het niet opnieuw van schijf gelezen. `xmlfile` komt ongewijzigd in de
+    regels; de CLI geeft absolute paden uit de discovery.
+
+    `tiers` geeft per check een tier-nummer (of None). De checks draaien op
+    volgorde van tier, binnen een tier XSD, native Schematron, Saxon. Een check
+    krijgt status "skipped" (upstream-invalid) zodra een check uit een lagere
+    tier invalid/error gaf, ook als die al eerder draaide (`upstream`, een
+    lijst `(tier, schemanaam)`, zie cli.process_chunk). Een niet-welgevormd
+    bestand faalt in zijn laagste tier; voor een Saxon-check met tier wordt dat
+    eerst met lxml gecontroleerd, zodat Java er niet aan begint.
+
+    Bestanden vanaf de stream-drempel (configure_stream_threshold) worden niet
+    in het geheugen gelezen of geparst: elke XSD valideert dan streamend in een
+    eigen doorloop en Saxon leest het bestand zelf. Alleen de native
+    Schematron bouwt dan nog (zelf) de hele boom op; zo'n bestand streamt dus
+    niet en telt in scheduler.MemoryBudget met zijn volle grootte mee.
+
+    Met fail-fast (configure_error_limits) krijgen de validaties na de eerste
+    invalid/error-regel van het bestand status "skipped".
+
+    Met `timings` krijgt elke regel een `timings`-dict; het gedeelde inlezen en
+    parsen telt mee bij de eerste validatie van het bestand.
+
+    Geeft paren `(n, regel)` terug, met `n` de positie van de check in
+    `checks`: door de tier-volgorde komen de regels niet in de volgorde van
+    `checks` terug, en twee schema's kunnen dezelfde naam hebben.
+    """
+    planned = sorted(enumerate(zip(checks, tiers or [None] * len(checks))),
+                     key=lambda ict: (ict[1][1] or 0, _CHECK_ORDER[ict[1][0][0]]))
+    shared = {} if timings else None
+    svrl = svrl or {}
+    rows = []
+    failures = list(upstream or [])
+
+    def sch_row(schema_path, schema_name, data=None):
+        report, seconds = svrl.get((xmlfile, schema_path), (None, 0.0))
+        row_timings = None
+        if timings:
+            row_timings = {"transform": seconds} if report is not None else {}
+        return validate_single_sch(xmlfile, schema_path, schema_name, verbose,
+                                   data=data, timings=row_timings, svrl=report)
+
+    def skip(n, validation_type, schema_name, tier):
+        # Fail-fast of een gefaalde lagere tier: deze validatie overslaan.
+        if _fail_fast and failures:
+            details = "Fail-fast: skipped after an earlier error in this file"
+        else:
+            blocked = blocking(tier, failures)
+            if not blocked:
+                return False
+            details = f"upstream-invalid ({', '.join(dict.fromkeys(blocked))})"
+        row = {
+            "file": xmlfile,
+            "schema": schema_name,
+            "validation_type": ("XSD" if validation_type == "XSD"
+                                else "Schematron"),
+            "status": "skipped",
+            "details": details
+        }
+        if timings:
+            row["timings"] = {}
+        rows.append((n, row))
+        return True
+
+    def add(n, row, tier):
+        rows.append((n, row))
+        if row["status"] in _FAILED:
+            failures.append((tier, row["schema"]))
+
+    stream = False
+    if data is None and _stream_threshold is not None:
+        try:
+            stream = streams(os.stat(xmlfile).st_size)
+        except OSError:
+            pass
+
+    # Alleen de bytes in het geheugen houden als de helper ze kan gebruiken;
+    # anders parsen we direct van schijf en laat Saxon zelf lezen.
+    if (data is None and not stream
+            and any(c[0] == "Schematron" for c in checks)
+            and get_saxon_server() is not None):
+        with phase(shared, "read"):
+            data = Path(xmlfile).read_bytes()
+
+    doc = parse_error = None
+    parsed = False
+
+    def parse():
+        # Eén keer parsen, pas als een validatie de boom nodig heeft.
+        nonlocal doc, parse_error, parsed
+        if parsed:
+            return
+        parsed = True
+        try:
+            with phase(shared, "parse"):
+                if data is not None:
+                    doc = etree.fromstring(data, base_url=str(xmlfile)).getroottree()
+                else:
+                    doc = etree.parse(xmlfile)
+        except Exception as e:
+            parse_error = e
+
+    for n, ((validation_type, schema_path, schema_name), tier) in planned:
+        if skip(n, validation_type, schema_name, tier):
+            continue
+        row_timings = {} if timings else None
+        if validation_type == "Schematron":
+            if tier is not None and not parsed:
+                if stream:
+                    parsed = True
+                    try:
+                        with phase(shared, "parse"):
+                            _check_wellformed(xmlfile)
+                    except Exception as e:
+                        parse_error = e
+                else:
+                    parse()
+            if tier is not None and parse_error is not None:
+                add(n, _error_row(xmlfile, validation_type, schema_name,
+                                  parse_error, timings), tier)
+            else:
+                add(n, sch_row(schema_path, schema_name, data), tier)
+        elif stream and validation_type == "XSD":
+            row = validate_single_xsd(xmlfile, schema_path, schema_name, verbose,
+                                      timings=row_timings, stream=True)
+            if row["status"] != "error":
+                parsed = True
+            add(n, row, tier)
+        elif stream:
+            # Native Schematron kan niet streamen: parst het bestand zelf.
+            add(n, validate_single_sch_native(xmlfile, schema_path, schema_name,
+                                              verbose, timings=row_timings), tier)
+        else:
+            parse()
+            if parse_error is not None:
+                add(n, _error_row(xmlfile, validation_type, schema_name,
+                                  parse_error, timings), tier)
+            elif validation_type == "XSD":
+                add(n, validate_single_xsd(xmlfile, schema_path, schema_name,
+                                           verbose, doc=doc, timings=row_timings),
+                    tier)
+            else:
+                add(n, validate_single_sch_native(xmlfile, schema_path, schema_name,
+                                                  verbose, doc=doc,
+                                                  timings=row_timings), tier)
+
+    if timings and rows:
+        first = rows[0][1]["timings"]
+        for p, seconds in shared.items():
+            first[p] = first.get(p, 0.0) + seconds
+    return rows
@@ -0,0 +1,250 @@
+import ctypes
+import ctypes.util
+import errno
+import logging
+import os
+import select
+import struct
+import time
+from pathlib import Path
+
+from .discovery import PatternMatcher, scan_files
+
+# inotify-constanten (linux/inotify.h).
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+_EVENT = struct.Struct("iIII")
+
+
+class Inotify:
+    """Minimale inotify-binding via ctypes (alleen Linux, geen extra package).
+
+    Wordt alleen gebruikt om te weten welke mappen veranderd zijn; wat er
+    precies nieuw is, bepaalt de Watcher met een scandir van die mappen.
+    Geeft een OSError als inotify niet beschikbaar is.
+    """
+
+    def __init__(self):
+        libc_name = ctypes.util.find_library("c")
+        try:
+            libc = ctypes.CDLL(libc_name, use_errno=True)
+            self._add_watch = libc.inotify_add_watch
+        except (OSError, AttributeError):
+            raise OSError("inotify not available") from None
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.dirs = {}   # watch-descriptor -> map
+
+    def add(self, path: str):
+        wd = self._add_watch(self.fd, os.fsencode(path), _WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, f"inotify_add_watch failed: {os.strerror(err)}", path)
+        self.dirs[wd] = path
+
+    def wait(self, timeout: float) -> bool:
+        """Wacht hooguit `timeout` seconden op events; True als er zijn."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        return bool(ready)
+
+    def read(self):
+        """Lees alle wachtende events; geeft `(mappen, nieuwe_mappen, overflow)`."""
+        changed, new_dirs, overflow = set(), set(), False
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            except OSError as e:
+                if e.errno == errno.EINTR:
+                    continue
+                raise
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT.unpack_from(data, offset)
+                name = data[offset + _EVENT.size:offset + _EVENT.size + length]
+                offset += _EVENT.size + length
+                if mask & IN_Q_OVERFLOW:
+                    overflow = True
+                    continue
+                if mask & IN_IGNORED:
+                    self.dirs.pop(wd, None)
+                    continue
+                directory = self.dirs.get(wd)
+                if directory is None:
+                    continue
+                if mask & IN_ISDIR:
+                    if mask & (IN_CREATE | IN_MOVED_TO):
+                        new_dirs.add(os.path.join(
+                            directory, os.fsdecode(name.rstrip(b"\0"))))
+                else:
+                    changed.add(directory)
+        return changed, new_dirs, overflow
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+def _subdirs(root: str):
+    """`root` en alle mappen eronder (zonder symlinks te volgen)."""
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        yield current
+        try:
+            with os.scandir(current) as it:
+                stack.extend(e.path for e in it
+                             if e.is_dir(follow_symlinks=False))
+        except OSError:
+            continue
+
+
+class Watcher:
+    """Houd de batchmappen in de gaten voor --watch (in het hoofdproces).
+
+    Levert werkeenheden `(pad, grootte, mtime_ns, indices)` op voor nieuwe of
+    gewijzigde bestanden die bij een validatie-pattern passen, net als
+    discovery.Discovery. Een bestand komt pas mee als grootte en mtime
+    `debounce` seconden niet veranderd zijn, zodat half geschreven bestanden
+    niet gevalideerd worden.
+
+    Met inotify (Linux) worden alleen de mappen met events opnieuw gelezen;
+    anders (of als inotify niet lukt, bv. te weinig watches) wordt elke
+    `interval` seconden de hele boom met scandir vergeleken met de vorige
+    snapshot.
+    """
+
+    def __init__(self, batches, validations, recursive: bool,
+                 interval: float = 1.0, debounce: float = 2.0,
+                 use_inotify: bool = True):
+        self.roots = [str(Path(b).resolve()) for b in batches]
+        self.recursive = recursive
+        self.matcher = PatternMatcher(validations)
+        self.interval = interval
+        self.debounce = debounce
+        self.known = {}     # pad -> (grootte, mtime_ns) van de laatst aangeboden versie
+        self.settling = {}  # pad -> (grootte, mtime_ns, indices, sinds): wacht op rust
+        self.last_scan = time.monotonic()
+        self.inotify = None
+        if use_inotify:
+            try:
+                self.inotify = Inotify()
+                for root in self.roots:
+                    self._watch(root)
+            except OSError as e:
+                logging.getLogger("xml_validator").warning(
+                    f"Watch: inotify unavailable ({e}); polling every "
+                    f"{interval:g}s instead.")
+                self.close()
+        self.mode = "inotify" if self.inotify is not None else "polling"
+
+    def _watch(self, root: str):
+        for directory in (_subdirs(root) if self.recursive else [root]):
+            self.inotify.add(directory)
+
+    def track(self, items):
+        """Laat de eerste discovery door de watcher lopen.
+
+        Alles wat voorbijkomt geldt als bekend; bestanden die jonger zijn dan
+        de debounce worden vastgehouden en pas aangeboden als ze stil staan.
+        """
+        now_ns = time.time_ns()
+        for f, size, mtime, hits in items:
+            if now_ns - mtime < self.debounce * 1e9:
+                self.settling[str(f)] = (size, mtime, hits, time.monotonic())
+                continue
+            self.known[str(f)] = (size, mtime)
+            yield f, size, mtime, hits
+
+    def _scan(self, dirs):
+        for root, recursive in dirs:
+            for path, name, entry in scan_files(root, recursive):
+                hits = self.matcher.match(name)
+                if not hits:
+                    continue
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                yield path, st.st_size, st.st_mtime_ns, hits
+
+    def _changed_dirs(self, now: float) -> list[tuple[str, bool]]:
+        """Mappen om opnieuw te lezen, als `(map, recursief)`."""
+        everything = [(root, self.recursive) for root in self.roots]
+        if self.inotify is None:
+            if now - self.last_scan < self.interval:
+                return []
+            self.last_scan = now
+            return everything
+        changed, new_dirs, overflow = self.inotify.read()
+        if overflow:
+            # Events gemist: alles opnieuw vergelijken.
+            return everything
+        dirs = [(directory, False) for directory in sorted(changed)]
+        if self.recursive:
+            for directory in sorted(new_dirs):
+                # Nieuwe submap: bewaken en volledig lezen (er kan al iets in
+                # staan voordat de watch er was).
+                try:
+                    self._watch(directory)
+                except OSError:
+                    pass
+                dirs.append((directory, True))
+        return dirs
+
+    def poll(self) -> list:
+        """Geef de bestanden die nu klaar zijn voor validatie (niet-blokkerend)."""
+        now = time.monotonic()
+        for path, size, mtime, hits in self._scan(self._changed_dirs(now)):
+            if self.known.get(path) == (size, mtime):
+                continue
+            current = self.settling.get(path)
+            if current is None or current[:2] != (size, mtime):
+                self.settling[path] = (size, mtime, hits, now)
+
+        ready = []
+        for path, (size, mtime, hits, since) in list(self.settling.items()):
+            if now - since < self.debounce:
+                continue
+            # Nog één keer kijken: wordt er nog geschreven, dan opnieuw wachten.
+            try:
+                st = os.stat(path)
+            except OSError:
+                del self.settling[path]
+                continue
+            if (st.st_size, st.st_mtime_ns) != (size, mtime):
+                self.settling[path] = (st.st_size, st.st_mtime_ns, hits, now)
+                continue
+            del self.settling[path]
+            self.known[path] = (size, mtime)
+            ready.append((Path(path), size, mtime, hits))
+        return ready
+
+    def wait(self, timeout: float | None = None):
+        """Wacht tot er iets te doen kan zijn (event, debounce of poll-interval)."""
+        timeout = self.interval if timeout is None else timeout
+        if self.settling:
+            timeout = min(timeout, self.debounce)
+        if self.inotify is not None:
+            self.inotify.wait(timeout)
+        else:
+            time.sleep(timeout)
+
+    def close(self):
+        if self.inotify is not None:
+            self.inotify.close()
+            self.inotify = None
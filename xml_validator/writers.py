@@ -0,0 +1,292 @@
+import json
+from datetime import datetime
+from pathlib import Path
+
+from .timings import TIMING_FIELDS, timing_values
+from .utils import CSV_FIELDS, CsvLogWriter
+
+# pyarrow wordt pas geladen als er Parquet geschreven wordt (zie _load_pyarrow):
+# het importeren kost meer dan de rest van de CLI bij elkaar.
+pa = pq = None
+
+OUTPUT_FORMATS = ("csv", "jsonl", "parquet")
+EXTENSIONS = {"csv": ".csv", "jsonl": ".jsonl", "parquet": ".parquet"}
+
+# Velden van één gestructureerde melding in `row["errors"]` (zie error_record).
+ERROR_FIELDS = ("kind", "line", "column", "domain", "location", "assert_id",
+                "message")
+
+
+def _load_pyarrow() -> bool:
+    """Importeer pyarrow bij eerste gebruik; False als het niet geïnstalleerd is."""
+    global pa, pq
+    if pa is None:
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:  # optioneel: alleen nodig voor output_format parquet
+            return False
+        pa, pq = pyarrow, pyarrow.parquet
+    return True
+
+
+def error_record(kind: str, message: str, line: int | None = None,
+                 column: int | None = None, domain: str | None = None,
+                 location: str | None = None,
+                 assert_id: str | None = None) -> dict:
+    """Eén melding als dict met alle ERROR_FIELDS.
+
+    `kind` is "error" (XSD/parser), "assert" (failed-assert) of "report"
+    (successful-report). Onbekende velden zijn None.
+    """
+    return {"kind": kind, "line": line or None, "column": column or None,
+            "domain": domain, "location": location, "assert_id": assert_id,
+            "message": message}
+
+
+def parse_formats(value) -> list[str]:
+    """Zet `csv`, `csv,parquet` of een lijst om naar een lijst formaten.
+
+    Een onbekend formaat of parquet zonder pyarrow geeft een ValueError.
+    """
+    if isinstance(value, str):
+        value = value.split(",")
+    formats = []
+    for fmt in value or ["csv"]:
+        fmt = str(fmt).strip().lower()
+        if fmt not in OUTPUT_FORMATS:
+            raise ValueError(f"unknown output format: {fmt!r} "
+                             f"(choose from {', '.join(OUTPUT_FORMATS)})")
+        if fmt == "parquet" and not _load_pyarrow():
+            raise ValueError("output format 'parquet' needs pyarrow "
+                             "(pip install pyarrow)")
+        if fmt not in formats:
+            formats.append(fmt)
+    return formats
+
+
+def _record(row, timings: bool, dedup: bool) -> dict:
+    """Eén resultaatregel als platte dict voor JSON Lines/Parquet."""
+    record = {field: str(row.get(field, "")) for field in CSV_FIELDS}
+    if dedup:
+        record["duplicate_of"] = row.get("duplicate_of")
+    if timings:
+        record.update(timing_values(row))
+    record["errors"] = row.get("errors") or []
+    return record
+
+
+class JsonlLogWriter:
+    """Schrijf resultaatregels als JSON Lines (één object per regel).
+
+    Zelfde velden als de CSV, plus `errors`: de gestructureerde meldingen
+    (zie ERROR_FIELDS). Timings staan als getallen (ms) in de t_*-velden.
+    Gebufferd en geflusht per `buffer_rows`, net als CsvLogWriter.
+    """
+
+    def __init__(self, path: Path, buffer_rows: int = 1000,
+                 timings: bool = False, dedup: bool = False):
+        self.path = path
+        self.buffer_rows = buffer_rows
+        self.buffer = []
+        self.timings = timings
+        self.dedup = dedup
+        self.file = path.open("a", encoding="utf-8")
+
+    def write(self, rows):
+        self.buffer.extend(rows)
+        if len(self.buffer) >= self.buffer_rows:
+            self.flush()
+
+    def flush(self):
+        self.file.writelines(
+            json.dumps(_record(row, self.timings, self.dedup),
+                       ensure_ascii=False) + "\n"
+            for row in self.buffer)
+        self.buffer.clear()
+        self.file.flush()
+
+    def close(self):
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _parquet_schema(timings: bool, dedup: bool):
+    error = pa.struct([
+        ("kind", pa.string()),
+        ("line", pa.int64()),
+        ("column", pa.int64()),
+        ("domain", pa.string()),
+        ("location", pa.string()),
+        ("assert_id", pa.string()),
+        ("message", pa.string()),
+    ])
+    fields = [(field, pa.string()) for field in CSV_FIELDS]
+    if dedup:
+        fields.append(("duplicate_of", pa.string()))
+    if timings:
+        fields.extend((field, pa.float64()) for field in TIMING_FIELDS)
+    fields.append(("errors", pa.list_(error)))
+    return pa.schema(fields)
+
+
+class ParquetLogWriter:
+    """Schrijf resultaatregels naar Parquet, één row group per `buffer_rows`.
+
+    Kolommen als bij JsonlLogWriter; `errors` is een lijst van structs, zodat
+    bv. alle meldingen per assert_id of domain zonder tekst-parsen te tellen
+    zijn. Parquet kan niet aanvullen: elke run schrijft een nieuw bestand, en
+    pas na close() is het bestand leesbaar. Vereist pyarrow.
+    """
+
+    def __init__(self, path: Path, buffer_rows: int = 50000,
+                 timings: bool = False, dedup: bool = False):
+        if not _load_pyarrow():
+            raise RuntimeError("Parquet-output vereist pyarrow (pip install pyarrow)")
+        self.path = path
+        self.buffer_rows = buffer_rows
+        self.buffer = []
+        self.timings = timings
+        self.dedup = dedup
+        self.schema = _parquet_schema(timings, dedup)
+        self.writer = pq.ParquetWriter(str(path), self.schema,
+                                       compression="zstd")
+
+    def write(self, rows):
+        self.buffer.extend(rows)
+        if len(self.buffer) >= self.buffer_rows:
+            self.flush()
+
+    def flush(self):
+        if not self.buffer:
+            return
+        table = pa.Table.from_pylist(
+            [_record(row, self.timings, self.dedup) for row in self.buffer],
+            schema=self.schema)
+        self.writer.write_table(table)
+        self.buffer.clear()
+
+    def close(self):
+        if self.writer is not None:
+            self.flush()
+            self.writer.close()
+            self.writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+WRITERS = {"csv": CsvLogWriter, "jsonl": JsonlLogWriter,
+           "parquet": ParquetLogWriter}
+
+
+class MultiLogWriter:
+    """Stuur dezelfde regels naar meerdere writers (één per formaat)."""
+
+    def __init__(self, writers):
+        self.writers = list(writers)
+
+    def write(self, rows):
+        for writer in self.writers:
+            writer.write(rows)
+
+    def flush(self):
+        # Parquet niet: elke flush wordt een row group en het bestand is pas
+        # na close() leesbaar.
+        for writer in self.writers:
+            if not isinstance(writer, ParquetLogWriter):
+                writer.flush()
+
+    def close(self):
+        for writer in self.writers:
+            writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_log_writers(formats, base: Path, timings: bool = False,
+                     dedup: bool = False):
+    """Open een writer per formaat op `base` + extensie.
+
+    Geeft `(writer, paths)` terug: één writer die naar alle formaten schrijft
+    en de bijbehorende bestandspaden.
+    """
+    paths = [base.with_suffix(EXTENSIONS[fmt]) for fmt in formats]
+    writers = []
+    try:
+        for fmt, path in zip(formats, paths):
+            writers.append(WRITERS[fmt](path, timings=timings, dedup=dedup))
+    except Exception:
+        for writer in writers:
+            writer.close()
+        raise
+    return MultiLogWriter(writers), paths
+
+
+class RollingLogWriter:
+    """Logs per periode voor --watch: een nieuwe set bestanden zodra de naam
+    wijzigt.
+
+    De naam is `pattern` (strftime, bv. `validation_log_watch_%Y-%m-%d` voor
+    één log per dag) in `directory`. CSV en JSON Lines vullen een bestaand
+    bestand van dezelfde periode aan; Parquet kan dat niet, dus bestaat dat
+    al, dan krijgt de nieuwe set een tijd-suffix. Na elke `write` wordt
+    geflusht, zodat resultaten direct in de log staan. `paths` bevat alle
+    geschreven bestanden.
+    """
+
+    def __init__(self, formats, directory: Path, pattern: str,
+                 timings: bool = False, dedup: bool = False):
+        self.formats = formats
+        self.directory = Path(directory)
+        self.pattern = pattern
+        self.timings = timings
+        self.dedup = dedup
+        self.name = None
+        self.writer = None
+        self.paths = []
+
+    def _roll(self):
+        name = datetime.now().strftime(self.pattern)
+        if name == self.name:
+            return
+        self.close()
+        base = self.directory / name
+        if "parquet" in self.formats and base.with_suffix(".parquet").exists():
+            base = base.with_name(name + datetime.now().strftime("_%H-%M-%S"))
+        self.writer, paths = open_log_writers(
+            self.formats, base, timings=self.timings, dedup=self.dedup)
+        self.name = name
+        self.paths.extend(p for p in paths if p not in self.paths)
+
+    def write(self, rows):
+        if not rows:
+            return
+        self._roll()
+        self.writer.write(rows)
+        self.writer.flush()
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,50 @@
+<?xml version="1.0" encoding="UTF-8"?>
+<!--
+  Driver voor Schematron-validatie van veel bestanden in één Saxon-run
+  (zie saxon.run_saxon_batch).
+
+  Parameters:
+    stylesheet  URI van de gecompileerde Schematron-validator (XSL)
+    files       URI van een tekstbestand met één XML-URI per regel
+    out         URI van de uitvoermap (met afsluitende /)
+
+  Voor regel N komt het SVRL-rapport in {out}N.svrl. Mislukt één bestand
+  (bv. niet welgevormd), dan komt daar een <batch-error> en gaat de run
+  door met de rest; de aanroeper doet dat bestand dan opnieuw los.
+-->
+<xsl:stylesheet version="3.0"
+                xmlns:xsl="http://www.w3.org/1999/XSL/Transform"
+                xmlns:xs="http://www.w3.org/2001/XMLSchema"
+                xmlns:err="http://www.w3.org/2005/xqt-errors"
+                exclude-result-prefixes="xs err"
+                expand-text="yes">
+
+  <xsl:param name="stylesheet" as="xs:string" required="yes"/>
+  <xsl:param name="files" as="xs:string" required="yes"/>
+  <xsl:param name="out" as="xs:string" required="yes"/>
+
+  <xsl:template name="xsl:initial-template">
+    <xsl:for-each select="unparsed-text-lines($files)">
+      <xsl:variable name="n" select="position()"/>
+      <xsl:variable name="uri" select="."/>
+      <xsl:result-document href="{$out}{$n}.svrl" method="xml">
+        <xsl:try>
+          <!-- source-document i.p.v. doc(): het document blijft niet in het
+               geheugen staan tot het einde van de run. -->
+          <xsl:source-document href="{$uri}" streamable="no">
+            <xsl:sequence select="transform(map {
+                'stylesheet-location': $stylesheet,
+                'cache': true(),
+                'source-node': .,
+                'global-context-item': .
+              })?output"/>
+          </xsl:source-document>
+          <xsl:catch>
+            <batch-error code="{$err:code}">{$err:description}</batch-error>
+          </xsl:catch>
+        </xsl:try>
+      </xsl:result-document>
+    </xsl:for-each>
+  </xsl:template>
+
+</xsl:stylesheet>